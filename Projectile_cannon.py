@@ -1,257 +1,2756 @@
-"""
-
-Smart Cannon: Projectile Motion Simulator
--------------------------------------
-
-Simulates a projectile (cannonball) launched from the ground, iteratively adjusts the
-launch angle to hit a specific target distance like an automated aiming system.
-
-Concepts demonstrated:
-- Projectile motion under constant gravity
-- Euler integration
-- Analytical vs. simulated results comparison
-- Feedback control through iteratie aim correction
-- Data visualization with Matplotlib 
-
-Written by Krina Amin
-
-"""
-
-
-import math
-import numpy as np
-import matplotlib.pyplot as plt
-
-def simulate_projectile(speed = 5, angle_deg = 45, dt = 0.01, g = 9.81, y0 = 0, max_time = 10):
-
-    """Simulates projectile motion using Euler integration."""
-    
-    t = 0.0
-    x = 0.0 # initial x positon
-    y = y0 # initial height
-    theta = math.radians(angle_deg) # initial angle
-    vx = speed * math.cos(theta) # velocity x component, constant
-    vy = speed * math.sin(theta) # velocity y component, dynamic
-
-    # Logs for values during motion
-    times = [t]
-    x_positions = [x]
-    y_positions = [y]
-    y_velocities = [vy]
-    
-    # Dynamics simulated using Euler's method
-    while t < max_time and y >= 0:
-        t += dt
-        x += dt * vx
-        vy += dt * -g
-        y += dt * vy
-        # linear interpolation between previous and current step
-        if y < 0:
-            y_prev = y_positions[-1]
-            x_prev = x_positions[-1]
-            frac = y_prev / (y_prev - y)     # fraction of step before impact
-            impact_x = x_prev + frac * (x - x_prev)
-            x_positions[-1] = impact_x
-            y_positions[-1] = 0
-            break
-        times.append(t)
-        x_positions.append(x)
-        y_positions.append(y)
-        y_velocities.append(vy)
-    return np.array(times), np.array(x_positions), np.array(y_positions), np.array(y_velocities)
-
-
-def plot_position(x_positions, y_positions):
-
-    """Plots the projectile’s trajectory."""
-
-    plt.plot(x_positions, y_positions, label="projectile trajectory")
-    plt.axhline(0, color="k", lw=1)
-    plt.xlabel("x (m)")
-    plt.ylabel("y (m)")
-    plt.title("Projectile's Position(no drag)")
-    plt.grid(True)
-    plt.legend()
-    plt.show()
-    
-
-def plot_velocity(times, y_velocities):
-
-    """Plots the projectile’s velocity."""
-
-    plt.plot(times, y_velocities, label= "projectile speed")
-    plt.axhline(0, color= "c", lw=1)
-    plt.xlabel("t (s)")
-    plt.ylabel("vertical velocity (m/s)")
-    plt.title("Projectile's Velocity Over Time")
-    plt.grid(True)
-    plt.legend()
-    plt.show()
-
-
-def compare_to_analytic(speed, angle_deg, g, sim_metrics):
-
-    """Compare simulated results to physics formulas."""
-
-    theta = math.radians(angle_deg)
-    H_theory = (speed**2 * math.sin(theta)**2) / (2*g)
-    T_theory = (2 * speed * math.sin(theta)) / g
-    R_theory = (speed**2 * math.sin(2*theta)) / g
-
-    print("\nTheoretical Values\n"
-        f"- Max height (theory): {H_theory:.2f} m\n"
-        f"- Range (theory):      {R_theory:.2f} m\n"
-        f"- Flight time (theory):{T_theory:.2f} s\n")
-    
-
-def compute_metrics(times, xs, ys):
-
-    """Compute and print metrics from simulation."""
-
-
-    max_y = np.max(ys)
-    t_at_max_y = times[np.argmax(ys)]
-    x_range = xs[-1]
-    flight_time = times[-1]
-    print("\nSimulated Values\n"
-        f"Maximum height reached: {max_y:.2f} at Time t = {t_at_max_y:.2f} s\n"
-        f"Horizontal Distance Aquired: {x_range:.2f} m\n"
-        f"Total Flight Time: {flight_time:.2f} s\n")
-
-
-def solve_angles(S):
-
-    """Return two angles θ₁ and θ₂ (degrees) that satisfy sin(2θ)=S."""
-    
-    # keep S inside [-1,1]
-    S = max(-1.0, min(1.0, S))
-    a = math.asin(S)  # a = 2θ₁
-    b = math.pi - a  # second solution for 2θ
-    th1 = math.degrees(a/2.0)
-    th2 = math.degrees(b/2.0)
-    return sorted({round(th1, 6), round(th2, 6)})
-
-
-def angle_for_target_x(speed, target_x, g=9.81):
-
-    """
-    Compute launch angle(s) (deg) that hit a horizontal target at x = target_x, assuming level ground and no air drag.
-    Returns a list of 0–2 angles.
-    """
-    
-    R_max = (speed**2) / g
-    if target_x < 0 or target_x > R_max:
-        print("Target too far for this speed.")
-        return []
-
-    S = (g * target_x) / (speed**2)
-    return solve_angles(S)
-
-
-def demo_target_hit():
-
-    """Demonstrate angles that hit a given target distance."""
-    
-    speed = 25.0
-    target_x = 50.0
-    angles = angle_for_target_x(speed, target_x)
-
-    if not angles:
-        return  # no valid angles for this speed
-
-    plt.figure()
-    for a in angles:
-        t, xs, ys, _ = simulate_projectile(speed=speed, angle_deg=a, dt=0.01)
-        plt.plot(xs, ys, label=f"{a:.2f}°")
-
-    # Plotting the trajectories of the two angles hit the target x distance
-    plt.axvline(target_x, color="g", linestyle="--", label="target")
-    plt.xlabel("x (m)")
-    plt.ylabel("y (m)")
-    plt.title("Angles That Hit the Target (no drag)")
-    plt.legend()
-    plt.grid(True)
-    plt.show()
-
-
-def iterative_aim(speed, target_x, initial_angle, learn_rate = 0.05, max_iters = 10, tol = 0.05):
-
-    """
-    Repeatedly adjust angle to make projectile hit the target.
-    Returns final_angle and a history list of attempts.
-    """
-
-    angle = initial_angle
-    history = []
-    for i in range(max_iters):
-        t, xs, ys, vys = simulate_projectile(speed, angle)
-        impact_x = xs[-1]
-        miss = target_x - impact_x
-        history.append({"try": i+1, "angle": angle, "impact_x": impact_x, "miss": miss})
-        if abs(miss) <= tol:
-            break
-        else:
-            angle += learn_rate * np.sign(miss) * math.log1p(abs(miss))
-            angle = max(0.0, min(85.0, angle))
-        print(f"Try {i+1}: angle={angle:.2f}°, miss={miss:.2f} m") # prints the real-time state of the system
-    best = min(history, key=lambda h: abs(h["miss"]))
-    if abs(history[-1]["miss"]) > tol and len(history) == max_iters:
-        print(f"Warning: Did not converge within {max_iters} iterations.")
-
-
-    # Visualization of angle correction
-    plt.figure()
-    for attempt in history:
-        t, xs, ys, _ = simulate_projectile(speed=speed, angle_deg=attempt["angle"])
-        plt.plot(xs, ys, label=f"Try {attempt['try']}: {attempt['angle']:.1f}° (miss={attempt['miss']:.2f})")
-    plt.axvline(target_x, color="g", linestyle="--", label=f"Target ({target_x} m)")
-    plt.xlabel("x (m)")
-    plt.ylabel("y (m)")
-    plt.legend()
-    plt.grid(True)
-    plt.title("Iterative Aiming Convergence")
-    plt.show()
-
-    plt.figure()
-    plt.plot(range(1, len(history)+1), [h["miss"] for h in history], 'o-')
-    plt.axhline(0, color='k', lw=1)
-    plt.xlabel("Iteration")
-    plt.ylabel("Miss (m)")
-    plt.title("Miss Convergence Over Iterations")
-    plt.grid(True)
-    plt.show()
-
-    plt.figure()
-    plt.plot([h["try"] for h in history], [h["angle"] for h in history], 'o-')
-    plt.xlabel("Iteration")
-    plt.ylabel("Launch Angle (°)")
-    plt.title("Angle Adjustment Over Time")
-    plt.grid(True)
-    plt.show()
-    
-    errors = [abs(h["miss"]) for h in history]
-    print("Miss magnitudes per try:", np.round(errors, 2)) # Prints summary of absolute errors using history list
-
-    return best["angle"], history, abs(best["miss"])
-                
-    
-if __name__ == "__main__":
-    # Base projectile test
-    t, xs, ys, vys = simulate_projectile()
-    plot_position(xs, ys)
-    plot_velocity(t, vys)
-    compute_metrics(t, xs, ys)
-
-    # Target-hitting demo
-    demo_target_hit()
-
-    # Controller test
-    best_angle, history, final_error = iterative_aim(
-        speed = 25.0,
-        target_x = 45.0,
-        initial_angle = 25.0,
-        learn_rate = 0.05,
-        max_iters = 15,
-        tol = 0.5
-        )
-    print(f"Final best angle ≈ {best_angle:.2f}° (error={final_error:.3f} m) after {len(history)} tries")
+"""
+
+Smart Cannon: Projectile Motion Simulator
+-------------------------------------
+
+Simulates a projectile (cannonball) launched from the ground, iteratively adjusts the
+launch angle to hit a specific target distance like an automated aiming system.
+
+Concepts demonstrated:
+- Projectile motion under constant gravity
+- Euler integration
+- Analytical vs. simulated results comparison
+- Feedback control through iteratie aim correction
+- Data visualization with Matplotlib 
+
+Written by Krina Amin
+
+"""
+
+
+import copy
+import hashlib
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import matplotlib.pyplot as plt
+
+def simulate_projectile(speed = 5, angle_deg = 45, dt = 0.01, g = 9.81, y0 = 0, max_time = 10, engine = "euler",
+                        return_trajectory = True, out = None, rtol = 1e-6, atol = 1e-6, x_tol = None,
+                        impact = "linear", drag = None, wind = None):
+
+    """
+    Simulates projectile motion, using Euler integration by default.
+    engine selects the integrator:
+    - "euler": step-by-step loop
+    - "euler_closed_form": the same sequence evaluated directly from its closed form
+    - "verlet": second-order velocity Verlet, accurate at much larger dt than Euler
+    - "rk45": adaptive Dormand–Prince steps controlled by rtol/atol (dt is only the first trial step),
+      with the apex and the ground impact located exactly
+    impact sets how the fixed-step engines locate the ground crossing inside the last step:
+    - "linear": straight line between the last two samples; only x is corrected
+    - "quadratic": parabola through the last three samples (exact for the Euler sequence without drag)
+    - "hermite": cubic Hermite on position and velocity (exact for Verlet without drag)
+    The non-linear methods also move the final time and vertical velocity to the landing instant.
+    Pass a Drag as drag to add air resistance (every engine except "euler_closed_form"); without it
+    the shell flies in vacuum. wind (ConstantWind, LayeredWind or GriddedWind) moves the air the drag
+    acts against, so it needs a drag model too; the firing plane is z = 0.
+    Give x_tol (metres) to pick the step automatically: the largest dt whose estimated impact-x
+    error stays within x_tol (see auto_dt), or a matching atol for "rk45".
+    With return_trajectory=False only the scalar summary from simulate_impact is returned.
+    Pass a SimulationWorkspace as out to reuse its buffers; the returned arrays are then views
+    into it and are overwritten by the next call that uses the same workspace.
+    While enable_cache() is active, calls without out are memoized and return read-only arrays.
+    """
+
+    if _cache_active() and out is None:
+        return _CACHE.fetch(simulate_projectile, dict(speed=speed, angle_deg=angle_deg, dt=dt, g=g, y0=y0,
+                            max_time=max_time, engine=engine, return_trajectory=return_trajectory, rtol=rtol,
+                            atol=atol, x_tol=x_tol, impact=impact, drag=drag, wind=wind))
+    drag = _with_wind(drag, wind)
+    if not return_trajectory:
+        return simulate_impact(speed, angle_deg, dt, g, y0, max_time, engine, rtol, atol, x_tol, impact, drag=drag)
+    if engine not in _TRAJECTORY_ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {sorted(_TRAJECTORY_ENGINES)}")
+    if x_tol is not None:
+        dt, atol, _ = _step_for_x_tol(speed, angle_deg, x_tol, g, y0, engine, dt, atol, max_time, impact, drag)
+    options = _engine_options(engine, rtol, atol, impact, drag)
+    return _TRAJECTORY_ENGINES[engine](speed, angle_deg, dt, g, y0, max_time, out, **options)
+
+
+class SimulationWorkspace:
+
+    """
+    Preallocated trajectory buffers that simulate_projectile can reuse across calls.
+    Holds one (4, capacity) array with rows t, x, y and vy, grown only when a shot needs more room.
+    """
+
+    def __init__(self, capacity = 1024):
+        self.log = np.empty((4, capacity))
+
+    @property
+    def capacity(self):
+        return self.log.shape[1]
+
+    def reserve(self, n_samples):
+
+        """Makes room for at least n_samples, keeping what is already stored, and returns the buffer."""
+
+        if n_samples > self.capacity:
+            grown = np.empty((4, max(n_samples, 2 * self.capacity)))
+            grown[:, :self.capacity] = self.log
+            self.log = grown
+        return self.log
+
+
+class Drag:
+
+    """
+    Air-drag force model for the engines, set by the shell's mass (kg), diameter (m) and drag coefficient.
+    kind="quadratic": a = -k·|v|·v with k = ½·ρ·cd·A / m and A = π·d²/4, the regime of real shells.
+    cd may be a DragTable, making it a function of the Mach number |v| / sound_speed.
+    With an Atmosphere, ρ and the sound speed follow the shell's altitude instead of the fixed
+    rho and sound_speed.
+    kind="linear": Stokes drag a = -b·v with b = 3·π·μ·d / m (μ the air viscosity); cd is not used.
+    With a wind model the drag acts on the velocity relative to the moving air.
+    """
+
+    def __init__(self, mass, diameter, cd = 0.47, kind = "quadratic", rho = 1.225, mu = 1.81e-5,
+                 sound_speed = 343.0, atmosphere = None, wind = None):
+        if kind not in ("linear", "quadratic"):
+            raise ValueError(f"Unknown drag kind {kind!r}; expected 'linear' or 'quadratic'")
+        if mass <= 0 or diameter <= 0:
+            raise ValueError("Drag needs a positive mass and diameter")
+        if kind == "linear" and (isinstance(cd, DragTable) or atmosphere is not None):
+            raise ValueError("A Cd table or an atmosphere only applies to quadratic drag")
+        self.mass, self.diameter, self.cd, self.kind, self.rho, self.mu = mass, diameter, cd, kind, rho, mu
+        self.sound_speed = sound_speed
+        self.atmosphere = atmosphere
+        self.wind = wind
+        area = math.pi * diameter * diameter / 4
+        self.half_area_per_mass = 0.5 * area / mass # k per unit ρ·Cd
+        self.k0 = 0.5 * rho * area / mass # k per unit Cd
+        self.cd_table = cd if isinstance(cd, DragTable) else None
+        self.k = None if self.cd_table is not None else 0.5 * rho * cd * area / mass
+        self.b = 3 * math.pi * mu * diameter / mass
+
+    def __repr__(self):
+        return (f"Drag(mass={self.mass!r}, diameter={self.diameter!r}, cd={self.cd!r}, kind={self.kind!r}, "
+                f"rho={self.rho!r}, mu={self.mu!r}, sound_speed={self.sound_speed!r}, atmosphere={self.atmosphere!r}, "
+                f"wind={self.wind!r})")
+
+    def acceleration(self, vx, vy, y = 0.0, x = 0.0):
+
+        """
+        Drag acceleration (ax, ay) at velocity (vx, vy), height y above the launch ground and downrange
+        distance x; works on floats and on arrays of shots.
+        """
+
+        if self.wind is not None:
+            wx, wy, _ = self.wind.velocity(x, y)
+            vx, vy = vx - wx, vy - wy
+        c = self._coefficient(vx * vx + vy * vy, y)
+        return c * vx, c * vy
+
+    def acceleration_3d(self, vx, vy, vz, x = 0.0, y = 0.0, z = 0.0):
+
+        """
+        Drag acceleration (ax, ay, az) at velocity (vx, vy, vz) and position (x, y, z), with every wind
+        component (crosswind included) taken off the velocity first. With vz = 0 and no crosswind it
+        equals acceleration() exactly.
+        """
+
+        if self.wind is not None:
+            wx, wy, wz = self.wind.velocity(x, y, z)
+            vx, vy, vz = vx - wx, vy - wy, vz - wz
+        c = self._coefficient(vx * vx + vy * vy + vz * vz, y)
+        return c * vx, c * vy, c * vz
+
+    def _coefficient(self, speed_sq, y):
+
+        """Factor c with a = c * v for an air-relative squared speed speed_sq at height y."""
+
+        if self.kind == "linear":
+            return -self.b
+        speed = speed_sq ** 0.5
+        if self.atmosphere is not None:
+            rho, sound_speed = self.atmosphere.air(y)
+            cd = self.cd if self.cd_table is None else self.cd_table.cd(speed / sound_speed)
+            return -self.half_area_per_mass * rho * cd * speed
+        if self.cd_table is None:
+            return -self.k * speed
+        return -self.k0 * self.cd_table.cd(speed * (1 / self.sound_speed)) * speed
+
+
+class DragTable:
+
+    """
+    Drag coefficient as a function of Mach number, resampled once onto a uniform Mach grid.
+    The tabulated points are joined by a monotone cubic (PCHIP), so the resampling adds no
+    overshoot, and each lookup is then one index computation plus a linear blend of two grid values.
+    Below the first and above the last tabulated Mach the end values are held.
+    """
+
+    def __init__(self, mach, cd, step = 0.005):
+        mach = np.asarray(mach, dtype=float)
+        cd = np.asarray(cd, dtype=float)
+        if mach.ndim != 1 or mach.shape != cd.shape or mach.size < 2 or np.any(np.diff(mach) <= 0):
+            raise ValueError("DragTable needs matching 1-D mach and cd arrays with strictly increasing mach")
+        n = int(math.ceil((mach[-1] - mach[0]) / step)) + 1
+        grid = np.linspace(mach[0], mach[-1], n)
+        self.mach0 = float(mach[0])
+        self.step = float(grid[1] - grid[0])
+        self.inv_step = 1 / self.step
+        self.values = _pchip_eval(mach, cd, _pchip_slopes(mach, cd), grid)
+        self._list = self.values.tolist() # python floats for the scalar engines
+        self._last = n - 1
+        self._key = hashlib.sha256(np.stack((mach, cd)).tobytes()).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, path, step = 0.005):
+
+        """
+        Reads a two-column (Mach, Cd) table from a comma-separated text file or a .npy file of shape
+        (n, 2). Each file is read and resampled once per process; later calls return the same table.
+        """
+
+        key = (os.path.abspath(path), os.path.getmtime(path), step)
+        table = _DRAG_TABLES.get(key)
+        if table is None:
+            data = np.load(path) if path.endswith(".npy") else np.loadtxt(path, delimiter=",", ndmin=2)
+            table = _DRAG_TABLES[key] = cls(data[:, 0], data[:, 1], step)
+        return table
+
+    def __repr__(self):
+        return f"DragTable(mach0={self.mach0!r}, step={self.step!r}, n={len(self._list)}, source={self._key})"
+
+    def cd(self, mach):
+
+        """Cd at the given Mach number(s): a float for a float, an array for an array."""
+
+        last = self._last
+        if isinstance(mach, np.ndarray):
+            pos = np.clip((mach - self.mach0) * self.inv_step, 0, last)
+            i = np.minimum(pos.astype(np.intp), last - 1)
+            return self.values[i] + (pos - i) * (self.values[i + 1] - self.values[i])
+        pos = (mach - self.mach0) * self.inv_step
+        if pos <= 0:
+            return self._list[0]
+        if pos >= last:
+            return self._list[last]
+        i = int(pos)
+        return self._list[i] + (pos - i) * (self._list[i + 1] - self._list[i])
+
+
+_DRAG_TABLES = {} # (path, mtime, step) -> DragTable
+
+
+def _with_wind(drag, wind):
+
+    """The drag model to simulate with: drag itself, or a copy of it blowing in wind."""
+
+    if wind is None:
+        return drag
+    if drag is None:
+        raise ValueError("wind acts through air drag; pass a Drag as drag as well")
+    windy = copy.copy(drag)
+    windy.wind = wind
+    return windy
+
+
+class ConstantWind:
+
+    """Uniform wind (m/s): wx along the firing direction (negative is a headwind), wy vertical, wz across."""
+
+    def __init__(self, wx, wy = 0.0, wz = 0.0):
+        self.wx, self.wy, self.wz = float(wx), float(wy), float(wz)
+
+    def __repr__(self):
+        return f"ConstantWind({self.wx!r}, {self.wy!r}, {self.wz!r})"
+
+    def velocity(self, x, y, z = 0.0):
+
+        """Wind components (wx, wy, wz) at a position; the same everywhere."""
+
+        return self.wx, self.wy, self.wz
+
+
+class LayeredWind:
+
+    """
+    Wind that varies with height only. Components are given at heights above the launch ground,
+    blended linearly in between and held below the first and above the last; the profile is
+    resampled once onto a uniform step so each lookup is one index computation.
+    """
+
+    def __init__(self, heights, wx, wy = 0.0, wz = 0.0, step = 10.0):
+        heights = np.atleast_1d(np.asarray(heights, dtype=float))
+        if heights.ndim != 1 or heights.size < 1 or np.any(np.diff(heights) <= 0):
+            raise ValueError("LayeredWind needs strictly increasing heights")
+        n = max(int(math.ceil((heights[-1] - heights[0]) / step)), 1) + 1
+        grid = np.linspace(heights[0], heights[0] + (n - 1) * step, n)
+        self.y0, self.step, self.inv_step = float(heights[0]), float(step), 1 / float(step)
+        profile = np.stack([np.broadcast_to(np.asarray(w, dtype=float), heights.shape) for w in (wx, wy, wz)])
+        self.values = np.stack([np.interp(grid, heights, w) for w in profile])
+        self._lists = self.values.tolist() # python floats for the scalar engines
+        self._last = n - 1
+        self._key = hashlib.sha256(np.vstack((heights, profile)).tobytes()).hexdigest()[:16]
+
+    def __repr__(self):
+        return f"LayeredWind(y0={self.y0!r}, step={self.step!r}, n={self._last + 1}, source={self._key})"
+
+    def velocity(self, x, y, z = 0.0):
+
+        """Wind components (wx, wy, wz) at height y, for a float or an array of heights."""
+
+        last = self._last
+        if isinstance(y, np.ndarray):
+            pos = np.clip((y - self.y0) * self.inv_step, 0, last)
+            i = np.minimum(pos.astype(np.intp), last - 1)
+            frac = pos - i
+            return tuple(w[i] + frac * (w[i + 1] - w[i]) for w in self.values)
+        pos = (y - self.y0) * self.inv_step
+        if pos <= 0:
+            return tuple(w[0] for w in self._lists)
+        if pos >= last:
+            return tuple(w[last] for w in self._lists)
+        i = int(pos)
+        frac = pos - i
+        return tuple(w[i] + frac * (w[i + 1] - w[i]) for w in self._lists)
+
+
+class GriddedWind:
+
+    """
+    Wind sampled from a regular grid over (x, y) or (x, y, z). field has shape (nx, ny, C) or
+    (nx, ny, nz, C) with C = 2 (wx, wy) or 3 (wx, wy, wz) components; grid point (i, j, k) sits at
+    origin + (i, j, k) * spacing, with y above the launch ground. Lookups blend the surrounding cell
+    corners (bilinear or trilinear) and hold the edge values outside the grid.
+    The inverse spacing, clamping limits and flat-index offsets of the cell corners are derived once
+    per field, so a batch of shots only pays for the per-position arithmetic.
+    """
+
+    def __init__(self, field, origin = 0.0, spacing = 1.0):
+        field = np.asarray(field, dtype=float)
+        ndim = field.ndim - 1
+        if ndim not in (2, 3) or field.shape[-1] not in (2, 3) or min(field.shape[:-1]) < 2:
+            raise ValueError("GriddedWind needs a field of shape (nx, ny, C) or (nx, ny, nz, C) with C = 2 or 3 "
+                             "and at least two points per axis")
+        self.ndim = ndim
+        self.shape = field.shape[:-1]
+        self.origin = np.broadcast_to(np.asarray(origin, dtype=float), (ndim,)).copy()
+        self.spacing = np.broadcast_to(np.asarray(spacing, dtype=float), (ndim,)).copy()
+        self.inv_spacing = 1 / self.spacing
+        self._limits = [n - 1 for n in self.shape] # largest grid position per axis
+        self._strides = [int(np.prod(self.shape[a + 1:])) for a in range(ndim)]
+        # one flat array per component; a missing wz is zero
+        self._components = [np.ascontiguousarray(field[..., c]).ravel() for c in range(field.shape[-1])]
+        # corner pattern of a cell (1 = upper neighbour on that axis) and its flat offset from the lowest corner
+        self._corners = [(bits, sum(b * stride for b, stride in zip(bits, self._strides)))
+                         for bits in np.ndindex(*(2,) * ndim)]
+        # python floats for the scalar engines
+        self._lists = [component.tolist() for component in self._components]
+        self._axes = [(float(self.origin[a]), float(self.inv_spacing[a]), self._limits[a], self._strides[a])
+                      for a in range(ndim)]
+        self._key = hashlib.sha256(field.tobytes()).hexdigest()[:16]
+
+    @classmethod
+    def load(cls, path, origin = 0.0, spacing = 1.0):
+
+        """Reads the field from a .npy file once per process; later calls with the same file share it."""
+
+        key = (os.path.abspath(path), os.path.getmtime(path), repr(origin), repr(spacing))
+        wind = _WIND_FIELDS.get(key)
+        if wind is None:
+            wind = _WIND_FIELDS[key] = cls(np.load(path), origin, spacing)
+        return wind
+
+    def __repr__(self):
+        return (f"GriddedWind(shape={self.shape!r}, origin={self.origin.tolist()!r}, "
+                f"spacing={self.spacing.tolist()!r}, source={self._key})")
+
+    def velocity(self, x, y, z = 0.0):
+
+        """Wind components (wx, wy, wz) at the given position(s): floats for floats, arrays for arrays."""
+
+        if not any(isinstance(c, np.ndarray) for c in (x, y, z)):
+            return self._velocity_scalar((x, y, z))
+        coords = np.broadcast_arrays(*(np.atleast_1d(np.asarray(c, dtype=float)) for c in (x, y, z)[:self.ndim]))
+        flat = 0
+        upper, lower = [], [] # per axis, the weight of the upper and lower neighbour
+        for a, c in enumerate(coords):
+            pos = np.clip((c - self.origin[a]) * self.inv_spacing[a], 0, self._limits[a])
+            i = np.minimum(pos.astype(np.intp), self._limits[a] - 1)
+            flat = flat + i * self._strides[a]
+            upper.append(pos - i)
+            lower.append(1 - upper[-1])
+        wind = [np.zeros(coords[0].shape) for _ in range(3)]
+        for bits, offset in self._corners:
+            weight = upper[0] if bits[0] else lower[0]
+            for a in range(1, self.ndim):
+                weight = weight * (upper[a] if bits[a] else lower[a])
+            index = flat + offset
+            for c, component in enumerate(self._components):
+                wind[c] += weight * component[index]
+        return tuple(wind)
+
+    def _velocity_scalar(self, position):
+
+        """velocity() for one position in plain Python floats, with the same operations as the array path."""
+
+        flat = 0
+        upper, lower = [], []
+        for (origin, inv_spacing, limit, stride), c in zip(self._axes, position):
+            pos = (c - origin) * inv_spacing
+            pos = 0.0 if pos <= 0 else limit if pos >= limit else pos
+            i = min(int(pos), limit - 1)
+            flat += i * stride
+            upper.append(pos - i)
+            lower.append(1 - upper[-1])
+        wind = [0.0, 0.0, 0.0]
+        for bits, offset in self._corners:
+            weight = upper[0] if bits[0] else lower[0]
+            for a in range(1, self.ndim):
+                weight = weight * (upper[a] if bits[a] else lower[a])
+            index = flat + offset
+            for c, component in enumerate(self._lists):
+                wind[c] += weight * component[index]
+        return tuple(wind)
+
+
+_WIND_FIELDS = {} # (path, mtime, origin, spacing) -> GriddedWind
+
+
+class Atmosphere:
+
+    """
+    International Standard Atmosphere (troposphere and stratosphere up to 32 km) tabulated once on a
+    uniform altitude grid. Heights given to lookups are above the launch ground, which sits at
+    ground_altitude metres above sea level; values are linearly interpolated between grid points and
+    held at the ends, so no exp or pow is evaluated while simulating.
+    """
+
+    def __init__(self, ground_altitude = 0.0, step = 10.0, top = 32000.0):
+        self.ground_altitude = float(ground_altitude)
+        self.step = float(step)
+        self.top = float(top)
+        self.heights = np.arange(0.0, top + step, step) # above sea level
+        self.temperature_table, self.density_table, self.sound_speed_table = _isa(self.heights)
+        self.inv_step = 1 / self.step
+        self._last = len(self.heights) - 1
+        self._density = self.density_table.tolist() # python floats for the scalar engines
+        self._sound_speed = self.sound_speed_table.tolist()
+
+    def __repr__(self):
+        return f"Atmosphere(ground_altitude={self.ground_altitude!r}, step={self.step!r}, top={self.top!r})"
+
+    def air(self, y):
+
+        """(density, sound speed) at height y above the launch ground, for a float or an array of heights."""
+
+        last = self._last
+        if isinstance(y, np.ndarray):
+            pos = np.clip((y + self.ground_altitude) * self.inv_step, 0, last)
+            i = np.minimum(pos.astype(np.intp), last - 1)
+            frac = pos - i
+            rho, a = self.density_table, self.sound_speed_table
+            return rho[i] + frac * (rho[i + 1] - rho[i]), a[i] + frac * (a[i + 1] - a[i])
+        pos = (y + self.ground_altitude) * self.inv_step
+        if pos <= 0:
+            return self._density[0], self._sound_speed[0]
+        if pos >= last:
+            return self._density[last], self._sound_speed[last]
+        i = int(pos)
+        frac = pos - i
+        rho, a = self._density, self._sound_speed
+        return rho[i] + frac * (rho[i + 1] - rho[i]), a[i] + frac * (a[i + 1] - a[i])
+
+    def density(self, y):
+
+        """Air density (kg/m³) at height y above the launch ground."""
+
+        return self.air(y)[0]
+
+    def sound_speed(self, y):
+
+        """Speed of sound (m/s) at height y above the launch ground."""
+
+        return self.air(y)[1]
+
+    def temperature(self, y):
+
+        """Air temperature (K) at height y above the launch ground."""
+
+        return np.interp(np.asarray(y) + self.ground_altitude, self.heights, self.temperature_table)
+
+
+def _isa(heights):
+
+    """ISA temperature (K), density (kg/m³) and speed of sound (m/s) at heights (m) above sea level."""
+
+    R, g0, gamma = 287.05287, 9.80665, 1.4
+    # base height, base temperature (K) and lapse rate (K/m) of each layer; the last one also covers
+    # anything above it, and the first anything below sea level
+    layers = ((0.0, 288.15, -0.0065), (11000.0, 216.65, 0.0), (20000.0, 216.65, 0.001))
+    which = np.searchsorted([h_base for h_base, _, _ in layers[1:]], heights, side="right")
+    temperature = np.empty_like(heights)
+    pressure = np.empty_like(heights)
+    p_base = 101325.0
+
+    for n, (h_base, T_base, lapse) in enumerate(layers):
+        def layer(dh):
+            T = T_base + lapse * dh
+            if lapse == 0:
+                return T, p_base * np.exp(-g0 * dh / (R * T_base))
+            return T, p_base * (T / T_base) ** (-g0 / (R * lapse))
+
+        inside = which == n
+        temperature[inside], pressure[inside] = layer(heights[inside] - h_base)
+        if n + 1 < len(layers):
+            p_base = float(layer(layers[n + 1][0] - h_base)[1]) # pressure at the base of the next layer
+    return temperature, pressure / (R * temperature), np.sqrt(gamma * R * temperature)
+
+
+def _simulate_euler(speed, angle_deg, dt, g, y0, max_time, out = None, impact = "linear", drag = None):
+
+    """Step-by-step Euler loop behind simulate_projectile."""
+    
+    t = 0.0
+    x = 0.0 # initial x positon
+    y = y0 # initial height
+    theta = math.radians(angle_deg) # initial angle
+    vx = speed * math.cos(theta) # velocity x component, constant without drag
+    vy = speed * math.sin(theta) # velocity y component, dynamic
+
+    # Logs for values during motion: one (4, n) buffer with rows t, x, y and vy, sized from the predicted
+    # flight time and written through 1-D memoryviews, whose scalar stores cost about as much as list.append
+    workspace = out if out is not None else SimulationWorkspace(0)
+    log = workspace.reserve(_predicted_samples(vy, dt, g, y0, max_time))
+    capacity = log.shape[1]
+    ts, xs, ys, vys = _log_rows(log)
+    ts[0], xs[0], ys[0], vys[0] = t, x, y, vy
+    n = 1
+    
+    # Dynamics simulated using Euler's method
+    while t < max_time and y >= 0:
+        t += dt
+        if drag is not None:
+            ax, ay = drag.acceleration(vx, vy, y, x)
+            vx += dt * ax
+            vy += dt * ay
+        x += dt * vx
+        vy += dt * -g
+        y += dt * vy
+        # linear interpolation between previous and current step
+        if y < 0:
+            if impact == "linear":
+                y_prev = ys[n - 1]
+                x_prev = xs[n - 1]
+                frac = y_prev / (y_prev - y)     # fraction of step before impact
+                xs[n - 1] = x_prev + frac * (x - x_prev)
+            else:
+                _land_in_log(log, n, impact, dt, x, y, vy)
+            ys[n - 1] = 0
+            break
+        if n == capacity:
+            log = workspace.reserve(n + 1)
+            capacity = log.shape[1]
+            ts, xs, ys, vys = _log_rows(log)
+        ts[n], xs[n], ys[n], vys[n] = t, x, y, vy
+        n += 1
+    return log[0, :n], log[1, :n], log[2, :n], log[3, :n]
+
+
+def _predicted_samples(vy, dt, g, y0, max_time):
+
+    """Number of samples to reserve for a trajectory, from the analytic (no drag) flight time."""
+
+    if not (g > 0 and y0 >= 0):
+        return 1024 # no landing to predict; start modest and let the log grow
+    flight_time = min((vy + math.sqrt(vy * vy + 2 * g * y0)) / g, max(max_time, 0))
+    # 10% margin plus a few samples covers Euler's early landing and short flights
+    return int(flight_time / dt * 1.1) + 8
+
+
+def _log_rows(log):
+
+    """One writable 1-D memoryview per row of a trajectory buffer."""
+
+    return tuple(memoryview(row) for row in log)
+
+
+def _simulate_verlet(speed, angle_deg, dt, g, y0, max_time, out = None, impact = "linear", drag = None):
+
+    """
+    Velocity-Verlet loop: second order, so it reaches Euler's range accuracy with a far larger dt.
+    Samples, impact correction and return format are the same as _simulate_euler.
+    """
+
+    t = 0.0
+    x = 0.0
+    y = y0
+    theta = math.radians(angle_deg)
+    vx = speed * math.cos(theta)
+    vy = speed * math.sin(theta)
+    half_g_dt2 = 0.5 * g * dt * dt
+
+    workspace = out if out is not None else SimulationWorkspace(0)
+    log = workspace.reserve(_predicted_samples(vy, dt, g, y0, max_time))
+    capacity = log.shape[1]
+    ts, xs, ys, vys = _log_rows(log)
+    ts[0], xs[0], ys[0], vys[0] = t, x, y, vy
+    n = 1
+
+    while t < max_time and y >= 0:
+        t += dt
+        if drag is None:
+            x += dt * vx
+            y += dt * vy - half_g_dt2 # position uses the start-of-step velocity and acceleration
+            vy += dt * -g # average of old and new acceleration, both -g without drag
+        else:
+            x, y, vx, vy = _verlet_drag_step(x, y, vx, vy, dt, g, drag)
+        if y < 0:
+            if impact == "linear":
+                y_prev = ys[n - 1]
+                x_prev = xs[n - 1]
+                frac = y_prev / (y_prev - y)
+                xs[n - 1] = x_prev + frac * (x - x_prev)
+            else:
+                _land_in_log(log, n, impact, dt, x, y, vy)
+            ys[n - 1] = 0
+            break
+        if n == capacity:
+            log = workspace.reserve(n + 1)
+            capacity = log.shape[1]
+            ts, xs, ys, vys = _log_rows(log)
+        ts[n], xs[n], ys[n], vys[n] = t, x, y, vy
+        n += 1
+    return log[0, :n], log[1, :n], log[2, :n], log[3, :n]
+
+
+def _verlet_drag_step(x, y, vx, vy, dt, g, drag):
+
+    """
+    One velocity-Verlet step with velocity-dependent drag. The end-of-step acceleration is taken at
+    the Euler-predicted velocity, which keeps the step explicit and second order.
+    """
+
+    ax, ay = drag.acceleration(vx, vy, y, x)
+    ay -= g
+    x += dt * vx + 0.5 * dt * dt * ax
+    y += dt * vy + 0.5 * dt * dt * ay
+    bx, by = drag.acceleration(vx + dt * ax, vy + dt * ay, y, x)
+    return x, y, vx + 0.5 * dt * (ax + bx), vy + 0.5 * dt * (ay + by - g)
+
+
+def _land_in_log(log, n, impact, dt, x, y, vy):
+
+    """Moves sample n - 1 of a trajectory log to the interpolated landing (t, x, vy), given the below-ground step."""
+
+    back = (log[1, n - 2], log[2, n - 2]) if n > 1 else (None, None)
+    u, log[1, n - 1], log[3, n - 1] = _interpolate_landing(
+        impact, dt, *back, log[1, n - 1], log[2, n - 1], log[3, n - 1], x, y, vy)
+    log[0, n - 1] += u * dt
+
+
+def _interpolate_landing(impact, dt, x_back, y_back, x_prev, y_prev, vy_prev, x_now, y_now, vy_now):
+
+    """
+    Ground crossing inside the step from the "prev" sample (above ground) to the "now" one (below),
+    with "back" the sample before prev (None if there is none). Returns the fraction u of the step
+    at the crossing, the landing x and the landing vertical velocity.
+    """
+
+    if impact == "hermite":
+        u = _hermite_crossing(y_prev, y_now, dt * vy_prev, dt * vy_now)
+        x = x_prev + u * (x_now - x_prev) # vx is constant between samples without drag, nearly so with it
+    else:
+        u = _quadratic_crossing(y_back, y_prev, y_now)
+        if y_back is None:
+            x = x_prev + u * (x_now - x_prev)
+        else:
+            x = 0.5 * u * (u - 1) * x_back + (1 - u * u) * x_prev + 0.5 * u * (u + 1) * x_now
+    return u, x, vy_prev + u * (vy_now - vy_prev)
+
+
+def _hermite_crossing(y0, y1, m0, m1):
+
+    """Fraction u in [0, 1] where the cubic Hermite with end values y0 > 0 > y1 and end slopes m0, m1 (per step) crosses zero."""
+
+    lo, hi = 0.0, 1.0
+    for _ in range(60):
+        u = 0.5 * (lo + hi)
+        value = (1 + 2 * u) * (1 - u) ** 2 * y0 + u * (1 - u) ** 2 * m0 + u * u * (3 - 2 * u) * y1 + u * u * (u - 1) * m1
+        if value > 0:
+            lo = u
+        else:
+            hi = u
+    return 0.5 * (lo + hi)
+
+
+def _euler_landing_step(vy, dt, g, y0):
+
+    """
+    Index n of the first Euler step that ends below ground (math.inf if it never does).
+    After n steps the loop above has y_n = y0 + b·n - a·n² with a = g·dt²/2 and b = dt·vy - a.
+    """
+
+    a = 0.5 * g * dt * dt
+    b = dt * vy - a
+    if a > 0:
+        root = (b + math.sqrt(b * b + 4 * a * y0)) / (2 * a)
+    elif b < 0:
+        root = y0 / -b
+    else:
+        return math.inf
+
+    def height(n):
+        return y0 + b * n - a * n * n
+
+    # rounding in the root can leave us a step off either way
+    n = max(1, math.floor(root) + 1)
+    while n > 1 and height(n - 1) < 0:
+        n -= 1
+    while height(n) >= 0:
+        n += 1
+    return n
+
+
+def _euler_closed_form_span(vy, dt, g, y0, max_time):
+
+    """Number of samples the Euler loop records, and whether it stopped by landing."""
+
+    if y0 < 0:
+        return 1, False
+    n_land = _euler_landing_step(vy, dt, g, y0)
+    if (n_land - 1) * dt < max_time - 1e-9 * max(max_time, dt):
+        return n_land, True
+
+    # near the max_time cut-off: accumulate t the same way the loop does so it stops on the same step
+    n_steps = min(n_land, math.ceil(max_time / dt) + 1)
+    times = np.concatenate(([0.0], np.cumsum(np.full(n_steps, dt))))
+    n_time = int(np.searchsorted(times, max_time, side="left"))
+    if n_land <= n_time:
+        return n_land, True
+    return n_time + 1, False
+
+
+def _simulate_euler_closed_form(speed, angle_deg, dt, g, y0, max_time, out = None, impact = "linear"):
+
+    """Replays the Euler sequence of _simulate_euler from its closed form, without a step loop."""
+
+    theta = math.radians(angle_deg)
+    vx = speed * math.cos(theta)
+    vy = speed * math.sin(theta)
+    n_samples, landed = _euler_closed_form_span(vy, dt, g, y0, max_time)
+    n_rows = n_samples + landed # includes the below-ground step if landed
+
+    # fill the rows in place: step index n first, then t, x, y and finally vy over n
+    workspace = out if out is not None else SimulationWorkspace(0)
+    log = workspace.reserve(n_rows)
+    times, xs, ys, vys = log[0, :n_rows], log[1, :n_rows], log[2, :n_rows], log[3, :n_rows]
+    n = vys
+    n[0] = 0.0
+    n[1:] = 1.0
+    np.cumsum(n, out=n)
+    times[0] = 0.0
+    times[1:] = dt
+    np.cumsum(times, out=times) # accumulates t the same way the loop does
+
+    a = 0.5 * g * dt * dt
+    np.multiply(n, dt * vx, out=xs)
+    np.multiply(n, -a, out=ys) # y_n = y0 + n·(b - a·n)
+    ys += dt * vy - a
+    ys *= n
+    ys += y0
+    n *= -g * dt
+    n += vy
+
+    if landed and impact == "linear":
+        # linear interpolation between the last two samples, as in the loop
+        frac = ys[-2] / (ys[-2] - ys[-1])
+        xs[-2] = xs[-2] + frac * (xs[-1] - xs[-2])
+        ys[-2] = 0
+    elif landed:
+        _land_in_log(log, n_samples, impact, dt, xs[-1], ys[-1], vys[-1])
+        ys[-2] = 0
+    return times[:n_samples], xs[:n_samples], ys[:n_samples], vys[:n_samples]
+
+
+# Dormand–Prince 5(4) tableau: stage weights, 5th-order weights and error weights (5th - 4th).
+# The forces do not depend on t, so the stage nodes are not needed.
+_DP_A = (
+    (),
+    (1/5,),
+    (3/40, 9/40),
+    (44/45, -56/15, 32/9),
+    (19372/6561, -25360/2187, 64448/6561, -212/729),
+    (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+)
+_DP_B = (35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84)
+_DP_E = (71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40)
+
+
+def _rhs(state, g, drag = None):
+
+    """Time derivative of the state (x, y, vx, vy) under gravity and, if given, drag."""
+
+    if drag is None:
+        return np.array([state[2], state[3], 0.0, -g])
+    ax, ay = drag.acceleration(state[2], state[3], state[1], state[0])
+    return np.array([state[2], state[3], ax, ay - g])
+
+
+def _rk45_steps(state, dt, g, max_time, rtol, atol, stats = None, drag = None):
+
+    """
+    Yields accepted Dormand–Prince steps as (t0, s0, f0, t1, s1, f1), where f is the state
+    derivative, until max_time is reached or a step ends below ground.
+    With a stats dict, stats["steps"] counts the accepted steps.
+    """
+
+    if stats is not None:
+        stats["steps"] = 0
+    t = 0.0
+    f = _rhs(state, g, drag)
+    h = dt
+    while t < max_time and state[1] >= 0:
+        h = min(h, max_time - t)
+        k = [f]
+        for a in _DP_A[1:]:
+            k.append(_rhs(state + h * sum(a_i * k_i for a_i, k_i in zip(a, k)), g, drag))
+        new_state = state + h * sum(b_i * k_i for b_i, k_i in zip(_DP_B, k))
+        k.append(_rhs(new_state, g, drag)) # first stage of the next step (FSAL)
+
+        error = h * sum(e_i * k_i for e_i, k_i in zip(_DP_E, k))
+        scale = atol + rtol * np.maximum(np.abs(state), np.abs(new_state))
+        err = math.sqrt(np.mean((error / scale) ** 2))
+        if err <= 1:
+            if stats is not None:
+                stats["steps"] += 1
+            yield t, state, f, t + h, new_state, k[-1]
+            t, state, f = t + h, new_state, k[-1]
+            h *= 10.0 if err == 0 else min(10.0, 0.9 * err ** -0.2)
+        else:
+            h *= max(0.2, 0.9 * err ** -0.2)
+
+
+def _hermite_point(t0, s0, f0, t1, s1, f1, u):
+
+    """Cubic Hermite interpolation of the state at fraction u of the step [t0, t1]."""
+
+    h = t1 - t0
+    h00 = (1 + 2 * u) * (1 - u) ** 2
+    h10 = u * (1 - u) ** 2
+    h01 = u * u * (3 - 2 * u)
+    h11 = u * u * (u - 1)
+    return t0 + u * h, h00 * s0 + h10 * h * f0 + h01 * s1 + h11 * h * f1
+
+
+def _hermite_root(t0, s0, f0, t1, s1, f1, component):
+
+    """Fraction u of the step where the Hermite cubic of one state component crosses zero (by bisection)."""
+
+    lo, hi = 0.0, 1.0
+    sign_lo = s0[component] > 0
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        if (_hermite_point(t0, s0, f0, t1, s1, f1, mid)[1][component] > 0) == sign_lo:
+            lo = mid
+        else:
+            hi = mid
+    return 0.5 * (lo + hi)
+
+
+def _rk45_samples(speed, angle_deg, dt, g, y0, max_time, rtol, atol, stats = None, drag = None):
+
+    """
+    Yields (t, state) samples of an RK45 flight: the start, every accepted step, the apex
+    where vy changes sign, and finally the interpolated ground impact with y = 0.
+    """
+
+    theta = math.radians(angle_deg)
+    state = np.array([0.0, y0, speed * math.cos(theta), speed * math.sin(theta)])
+    yield 0.0, state
+    for step in _rk45_steps(state, dt, g, max_time, rtol, atol, stats, drag):
+        _, s0, _, t1, s1, _ = step
+        if s0[3] > 0 >= s1[3]:
+            yield _hermite_point(*step, _hermite_root(*step, 3))
+        if s1[1] < 0:
+            t_impact, impact = _hermite_point(*step, _hermite_root(*step, 1))
+            impact[1] = 0.0
+            yield t_impact, impact
+            return
+        yield t1, s1
+
+
+def _simulate_rk45(speed, angle_deg, dt, g, y0, max_time, out = None, rtol = 1e-6, atol = 1e-6, drag = None):
+
+    """Adaptive Dormand–Prince trajectory in the same (times, xs, ys, vys) format as the Euler engines."""
+
+    samples = list(_rk45_samples(speed, angle_deg, dt, g, y0, max_time, rtol, atol, drag=drag))
+    workspace = out if out is not None else SimulationWorkspace(0)
+    log = workspace.reserve(len(samples))
+    n = len(samples)
+    log[0, :n] = [t for t, _ in samples]
+    log[1:, :n] = np.array([s[[0, 1, 3]] for _, s in samples]).T
+    return log[0, :n], log[1, :n], log[2, :n], log[3, :n]
+
+
+_TRAJECTORY_ENGINES = {
+    "euler": _simulate_euler,
+    "euler_closed_form": _simulate_euler_closed_form,
+    "verlet": _simulate_verlet,
+    "rk45": _simulate_rk45,
+}
+_ADAPTIVE_ENGINES = {"rk45"}
+_IMPACT_METHODS = ("linear", "quadratic", "hermite")
+
+
+def _engine_options(engine, rtol, atol, impact, drag = None):
+
+    """
+    Keyword options an engine understands: tolerances for adaptive engines, impact method for fixed-step ones,
+    and the drag model when there is one.
+    """
+
+    if drag is not None:
+        if engine == "euler_closed_form":
+            raise ValueError("engine 'euler_closed_form' has no drag model; use 'euler' instead")
+        options = _engine_options(engine, rtol, atol, impact)
+        options["drag"] = drag
+        return options
+
+    if impact not in _IMPACT_METHODS:
+        raise ValueError(f"Unknown impact method {impact!r}; expected one of {_IMPACT_METHODS}")
+    if engine in _ADAPTIVE_ENGINES:
+        return {"rtol": rtol, "atol": atol}
+    return {"impact": impact}
+
+
+def simulate_impact(speed = 5, angle_deg = 45, dt = 0.01, g = 9.81, y0 = 0, max_time = 10, engine = "euler",
+                    rtol = 1e-6, atol = 1e-6, x_tol = None, impact = "linear", stats = None, drag = None,
+                    wind = None):
+
+    """
+    Runs the same simulation as simulate_projectile but keeps no trajectory.
+    Returns impact_x, flight_time, apex_height and apex_time as floats, matching
+    xs[-1], times[-1], max(ys) and the time of max(ys) from the full trajectory.
+    Pass a dict as stats to receive the number of integration steps taken under "steps"
+    (0 for "euler_closed_form", which evaluates the sequence without stepping) and the step used under "dt";
+    with drag and x_tol the steps include the probe shots that chose dt, and the accepted probe is the result.
+    """
+
+    drag = _with_wind(drag, wind)
+    probe = {"steps": 0}
+    accepted = None
+    if x_tol is not None:
+        dt, atol, accepted = _step_for_x_tol(speed, angle_deg, x_tol, g, y0, engine, dt, atol, max_time, impact,
+                                             drag, probe)
+    if stats is not None:
+        stats["dt"] = dt
+    if accepted is not None:
+        if stats is not None:
+            stats["steps"] = probe["steps"]
+        return accepted
+    options = _engine_options(engine, rtol, atol, impact, drag)
+    if engine in _IMPACT_ENGINES:
+        result = _IMPACT_ENGINES[engine](speed, angle_deg, dt, g, y0, max_time, stats=stats, **options)
+        if stats is not None:
+            stats["steps"] += probe["steps"]
+        return result
+    if engine not in _TRAJECTORY_ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {sorted(_TRAJECTORY_ENGINES)}")
+    times, xs, ys, _ = _TRAJECTORY_ENGINES[engine](speed, angle_deg, dt, g, y0, max_time, **options)
+    if stats is not None:
+        stats["steps"] = len(times) - 1 + probe["steps"]
+    i_apex = int(np.argmax(ys))
+    return float(xs[-1]), float(times[-1]), float(ys[i_apex]), float(times[i_apex])
+
+
+def auto_dt(speed, angle_deg, x_tol, g = 9.81, y0 = 0, engine = "euler"):
+
+    """
+    Largest fixed step whose estimated impact-x error stays within x_tol metres.
+    Uses the no-drag error of each scheme: Euler samples sit g·dt·t/2 below the true parabola,
+    so the landing comes early by about g·dt·T/(2·|vy_land|) (first order in dt); Verlet samples
+    are exact and only the linear impact interpolation errs, by at most g·dt²/(8·|vy_land|).
+    Both are multiplied by vx to turn a time error into a range error.
+    These models ignore drag; with a drag model, simulate_projectile and simulate_impact use this
+    step only as the starting guess for step doubling.
+    """
+
+    theta = math.radians(angle_deg)
+    vx = abs(speed * math.cos(theta))
+    vy = speed * math.sin(theta)
+    vy_land = math.sqrt(max(vy * vy + 2 * g * y0, 0.0))
+    flight_time = (vy + vy_land) / g if g > 0 else 0.0
+    if flight_time <= 0 or vx == 0:
+        return 0.01 # lands at once or never moves sideways; any step gives the same impact x
+    vy_land = max(vy_land, 1e-9)
+
+    if engine in ("euler", "euler_closed_form"):
+        dt = 2 * x_tol * vy_land / (vx * g * flight_time)
+    elif engine == "verlet":
+        dt = math.sqrt(8 * x_tol * vy_land / (vx * g))
+    else:
+        raise ValueError(f"auto_dt has no error model for engine {engine!r}")
+    # 20% margin for the terms the estimates leave out, and a few steps per flight so the
+    # impact interpolation has something to work with
+    return min(0.8 * dt, flight_time / 4)
+
+
+def _step_for_x_tol(speed, angle_deg, x_tol, g, y0, engine, dt, atol, max_time = 10, impact = "linear", drag = None,
+                    stats = None):
+
+    """
+    (dt, atol, accepted) to use for an impact-x error budget: adaptive engines tighten atol, fixed-step
+    ones pick dt. Without drag the fixed step comes from auto_dt's error model and accepted is None.
+    With drag that model does not hold, so the step is found by step doubling: the impact at dt and dt/2
+    gives the error estimate |x(dt) - x(dt/2)|·2ᵖ/(2ᵖ - 1) for a scheme of order p, and dt shrinks until it
+    fits x_tol; accepted is then the simulate_impact result already computed at the chosen dt.
+    The probe shots' steps are added to stats["steps"].
+    """
+
+    if engine in _ADAPTIVE_ENGINES:
+        return dt, min(atol, 0.1 * x_tol), None
+    dt = auto_dt(speed, angle_deg, x_tol, g, y0, engine)
+    if drag is None or engine not in ("euler", "verlet"):
+        return dt, atol, None # euler_closed_form rejects drag in _engine_options
+
+    def landing(step):
+        probe = {}
+        result = simulate_impact(speed, angle_deg, step, g, y0, max_time, engine, impact=impact, stats=probe,
+                                 drag=drag)
+        if stats is not None:
+            stats["steps"] += probe["steps"]
+        return result
+
+    gain = 2.0 if engine == "euler" else 4.0 # 2ᵖ
+    coarse = landing(dt)
+    for _ in range(20):
+        fine = landing(0.5 * dt)
+        error = abs(coarse[0] - fine[0]) * gain / (gain - 1)
+        if error <= x_tol:
+            break
+        # jump towards the step the estimate predicts, but at least halve so the loop always ends
+        factor = min(0.5, 0.9 * (x_tol / error) ** (1 / math.log2(gain)))
+        dt *= factor
+        coarse = fine if factor == 0.5 else landing(dt)
+    return dt, atol, coarse
+
+
+def _impact_for_budget(memo, speed, angle_deg, x_tol, g, y0, max_time, engine, stats, drag):
+
+    """
+    simulate_impact with an impact-x budget, for the shots of one aiming solve. With drag on a fixed-step
+    engine the step found by step doubling is remembered in memo (budget -> [(angle, dt)]) and reused for
+    later shots with the same budget within 1° and 10% of that angle, instead of probing again (near 0° a
+    step chosen for a shot that barely leaves the ground says nothing about its neighbours).
+    stats must be a dict.
+    """
+
+    if drag is None or engine not in ("euler", "verlet"):
+        return simulate_impact(speed, angle_deg, g=g, y0=y0, max_time=max_time, engine=engine, x_tol=x_tol,
+                               stats=stats, drag=drag)
+    for angle, dt in memo.get(x_tol, ()):
+        if abs(angle - angle_deg) <= min(1.0, 0.1 * max(angle, angle_deg)):
+            return simulate_impact(speed, angle_deg, dt, g, y0, max_time, engine, stats=stats, drag=drag)
+    result = simulate_impact(speed, angle_deg, g=g, y0=y0, max_time=max_time, engine=engine, x_tol=x_tol,
+                             stats=stats, drag=drag)
+    memo.setdefault(x_tol, []).append((angle_deg, stats["dt"]))
+    return result
+
+
+def _impact_euler(speed, angle_deg, dt, g, y0, max_time, impact = "linear", stats = None, drag = None):
+
+    """Euler loop of _simulate_euler that only tracks the previous sample and the apex."""
+
+    t = 0.0
+    x = 0.0
+    y = y0
+    theta = math.radians(angle_deg)
+    vx = speed * math.cos(theta)
+    vy = speed * math.sin(theta)
+    apex_y, apex_t = y, t
+    before_x, before_y, before_t = None, None, t # sample preceding the current one
+
+    while t < max_time and y >= 0:
+        t_prev, x_prev, y_prev, vy_prev = t, x, y, vy
+        t += dt
+        if drag is not None:
+            ax, ay = drag.acceleration(vx, vy, y, x)
+            vx += dt * ax
+            vy += dt * ay
+        x += dt * vx
+        vy += dt * -g
+        y += dt * vy
+        if y < 0:
+            if impact == "linear":
+                frac = y_prev / (y_prev - y)
+                x = x_prev + frac * (x - x_prev)
+                t_land = t_prev
+            else:
+                u, x, _ = _interpolate_landing(impact, dt, before_x, before_y, x_prev, y_prev, vy_prev, x, y, vy)
+                t_land = t_prev + u * dt
+            # the last sample is put on the ground, so if it was the apex the one before takes over
+            if apex_t == t_prev:
+                apex_y, apex_t = (before_y, before_t) if t_prev > 0 else (0.0, t_land)
+            if stats is not None:
+                stats["steps"] = round(t_prev / dt) + 1
+            return x, t_land, apex_y, apex_t
+        if y > apex_y:
+            apex_y, apex_t = y, t
+        before_x, before_y, before_t = x_prev, y_prev, t_prev
+    if stats is not None:
+        stats["steps"] = round(t / dt)
+    return x, t, apex_y, apex_t
+
+
+def _impact_verlet(speed, angle_deg, dt, g, y0, max_time, impact = "linear", stats = None, drag = None):
+
+    """Velocity-Verlet loop of _simulate_verlet that only tracks the previous sample and the apex."""
+
+    t = 0.0
+    x = 0.0
+    y = y0
+    theta = math.radians(angle_deg)
+    vx = speed * math.cos(theta)
+    vy = speed * math.sin(theta)
+    half_g_dt2 = 0.5 * g * dt * dt
+    apex_y, apex_t = y, t
+    before_x, before_y, before_t = None, None, t
+
+    while t < max_time and y >= 0:
+        t_prev, x_prev, y_prev, vy_prev = t, x, y, vy
+        t += dt
+        if drag is None:
+            x += dt * vx
+            y += dt * vy - half_g_dt2
+            vy += dt * -g
+        else:
+            x, y, vx, vy = _verlet_drag_step(x, y, vx, vy, dt, g, drag)
+        if y < 0:
+            if impact == "linear":
+                frac = y_prev / (y_prev - y)
+                x = x_prev + frac * (x - x_prev)
+                t_land = t_prev
+            else:
+                u, x, _ = _interpolate_landing(impact, dt, before_x, before_y, x_prev, y_prev, vy_prev, x, y, vy)
+                t_land = t_prev + u * dt
+            if apex_t == t_prev:
+                apex_y, apex_t = (before_y, before_t) if t_prev > 0 else (0.0, t_land)
+            if stats is not None:
+                stats["steps"] = round(t_prev / dt) + 1
+            return x, t_land, apex_y, apex_t
+        if y > apex_y:
+            apex_y, apex_t = y, t
+        before_x, before_y, before_t = x_prev, y_prev, t_prev
+    if stats is not None:
+        stats["steps"] = round(t / dt)
+    return x, t, apex_y, apex_t
+
+
+def _impact_euler_closed_form(speed, angle_deg, dt, g, y0, max_time, impact = "linear", stats = None):
+
+    """Impact summary of the closed-form Euler sequence, evaluated only at the samples it needs."""
+
+    theta = math.radians(angle_deg)
+    vx = speed * math.cos(theta)
+    vy = speed * math.sin(theta)
+    n_samples, landed = _euler_closed_form_span(vy, dt, g, y0, max_time)
+    a = 0.5 * g * dt * dt
+    b = dt * vy - a
+    last = n_samples - 1
+
+    def height(n):
+        if landed and n == last:
+            return 0.0
+        return y0 + b * n - a * n * n
+
+    flight_time = last * dt
+    if landed:
+        y_last, y_next = y0 + b * last - a * last * last, y0 + b * (last + 1) - a * (last + 1) ** 2
+        if impact == "linear":
+            frac = y_last / (y_last - y_next)
+        else:
+            back = ((last - 1) * dt * vx, y0 + b * (last - 1) - a * (last - 1) ** 2) if last > 0 else (None, None)
+            frac, _, _ = _interpolate_landing(impact, dt, *back, last * dt * vx, y_last, vy - last * g * dt,
+                                              (last + 1) * dt * vx, y_next, vy - (last + 1) * g * dt)
+            flight_time += frac * dt
+        impact_x = (last + frac) * dt * vx
+    else:
+        impact_x = last * dt * vx
+
+    # y_n is a concave quadratic in n, so the apex sits next to its vertex (or at an end)
+    vertex = b / (2 * a) if a > 0 else last
+    candidates = sorted({0, last, max(last - 1, 0)} | {min(max(int(c), 0), last) for c in (math.floor(vertex), math.ceil(vertex))})
+    i_apex = max(candidates, key=lambda n: (height(n), -n))
+    apex_time = flight_time if landed and i_apex == last else i_apex * dt
+    if stats is not None:
+        stats["steps"] = 0
+    return impact_x, flight_time, height(i_apex), apex_time
+
+
+def _impact_rk45(speed, angle_deg, dt, g, y0, max_time, rtol = 1e-6, atol = 1e-6, stats = None, drag = None):
+
+    """Impact summary of an RK45 flight, keeping only the current sample and the apex."""
+
+    apex_t, apex = 0.0, None
+    for t, state in _rk45_samples(speed, angle_deg, dt, g, y0, max_time, rtol, atol, stats, drag):
+        if apex is None or state[1] > apex[1]:
+            apex_t, apex = t, state
+    return float(state[0]), t, float(apex[1]), apex_t
+
+
+_IMPACT_ENGINES = {
+    "euler": _impact_euler,
+    "euler_closed_form": _impact_euler_closed_form,
+    "verlet": _impact_verlet,
+    "rk45": _impact_rk45,
+}
+
+
+def richardson_impact(speed = 5, angle_deg = 45, dt = None, g = 9.81, y0 = 0, max_time = 10, levels = 3, x_tol = None,
+                      stats = None, drag = None):
+
+    """
+    Estimates impact x and flight time by Richardson extrapolation of coarse Euler runs at
+    dt, dt/2, dt/4, ... (levels runs). dt defaults to an eighth of the analytic flight time.
+    With x_tol, extra halvings are added (up to 8 runs) until successive extrapolants agree to x_tol.
+    drag adds air resistance to every run.
+    Returns impact_x, flight_time. A stats dict receives the total Euler steps of all runs under "steps".
+    """
+
+    if dt is None:
+        theta = math.radians(angle_deg)
+        vy = speed * math.sin(theta)
+        flight_time = (vy + math.sqrt(max(vy * vy + 2 * g * y0, 0.0))) / g if g > 0 else 0.0
+        dt = flight_time / 8 if flight_time > 0 else 0.01
+
+    # Neville table for an error series in powers of dt: row i holds the run at dt / 2**i
+    # and its extrapolants, column j has the dt**1 ... dt**j terms removed
+    table = []
+    max_levels = max(levels, 8) if x_tol is not None else levels
+    run_stats = {}
+    if stats is not None:
+        stats["steps"] = 0
+    for i in range(max_levels):
+        row = [np.array(_euler_landing(speed, angle_deg, dt / 2**i, g, y0, max_time, run_stats, drag))]
+        if stats is not None:
+            stats["steps"] += run_stats["steps"]
+        for j in range(1, i + 1):
+            row.append(row[j - 1] + (row[j - 1] - table[i - 1][j - 1]) / (2**j - 1))
+        table.append(row)
+        if i + 1 >= levels and (x_tol is None or (i > 0 and abs(row[-1][0] - row[-2][0]) <= x_tol)):
+            break
+    impact_x, flight_time = table[-1][-1]
+    return float(impact_x), float(flight_time)
+
+
+def _euler_landing(speed, angle_deg, dt, g, y0, max_time, stats = None, drag = None):
+
+    """
+    Euler loop of _simulate_euler returning the landing point and landing time.
+    Euler samples lie on a parabola in t, so the crossing is found on the quadratic through the
+    last three samples; unlike the linear correction this makes the result smooth in dt.
+    """
+
+    t = 0.0
+    x = 0.0
+    y = y0
+    theta = math.radians(angle_deg)
+    vx = speed * math.cos(theta)
+    vy = speed * math.sin(theta)
+    x_back, y_back = None, None # sample two steps back, once there is one
+
+    while t < max_time and y >= 0:
+        t_prev, x_prev, y_prev, vy_prev = t, x, y, vy
+        t += dt
+        if drag is not None:
+            ax, ay = drag.acceleration(vx, vy, y, x)
+            vx += dt * ax
+            vy += dt * ay
+        x += dt * vx
+        vy += dt * -g
+        y += dt * vy
+        if y < 0:
+            u, x, _ = _interpolate_landing("quadratic", dt, x_back, y_back, x_prev, y_prev, vy_prev, x, y, vy)
+            if stats is not None:
+                stats["steps"] = round(t_prev / dt) + 1
+            return x, t_prev + u * dt
+        x_back, y_back = x_prev, y_prev
+    if stats is not None:
+        stats["steps"] = round(t / dt)
+    return x, t
+
+
+def _quadratic_crossing(y_back, y_prev, y_now):
+
+    """
+    Fraction u in [0, 1] of the last step where the quadratic through samples at u = -1, 0, 1
+    crosses zero. Falls back to the linear crossing without a third sample.
+    """
+
+    linear = y_prev / (y_prev - y_now)
+    if y_back is None:
+        return linear
+    a = 0.5 * (y_now - 2 * y_prev + y_back)
+    b = 0.5 * (y_now - y_back)
+    disc = b * b - 4 * a * y_prev
+    if a == 0 or disc < 0:
+        return linear
+    q = -0.5 * (b + math.copysign(math.sqrt(disc), b))
+    for u in (q / a, y_prev / q if q != 0 else -1.0):
+        if 0 <= u <= 1:
+            return u
+    return linear
+
+
+def simulate_projectiles(speeds, angles_deg, dt = 0.01, g = 9.81, y0 = 0, max_time = 10, return_trajectory = True,
+                         drag = None, wind = None):
+
+    """
+    Simulates a batch of projectiles at once using the same Euler scheme as simulate_projectile.
+    speeds, angles_deg, y0 and g may be scalars or arrays and are broadcast together.
+    Returns padded (N, M) arrays of times, x, y and vertical velocity (NaN past each
+    shot's end) plus the number of valid samples per shot.
+    With return_trajectory=False nothing is logged and the per-shot arrays impact_x, flight_time,
+    apex_height and apex_time are returned instead, matching simulate_impact shot for shot.
+    drag (a Drag) is applied to every shot as one array update per step, and a gridded wind is
+    sampled for all shots with one vectorized interpolation.
+    """
+
+    drag = _with_wind(drag, wind)
+    speeds, angles_deg, y0, g = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (speeds, angles_deg, y0, g)))
+    speeds, angles_deg, y0, g = (a.ravel() for a in (speeds, angles_deg, y0, g))
+    n_shots = speeds.size
+
+    theta = np.radians(angles_deg)
+    vx = speeds * np.cos(theta) # constant per shot without drag
+    vy = speeds * np.sin(theta)
+    x = np.zeros(n_shots)
+    y = y0.copy()
+
+    # every shot shares the same clock, so one time log serves the whole batch
+    t = 0.0
+    if return_trajectory:
+        time_log = [t]
+        x_log = [x.copy()]
+        y_log = [y.copy()]
+        vy_log = [vy.copy()]
+    else:
+        t_end = np.zeros(n_shots) # time of each shot's last sample
+        apex_y, apex_t = y.copy(), np.zeros(n_shots)
+        before_y, before_t = y.copy(), np.zeros(n_shots) # sample preceding the last one
+    lengths = np.ones(n_shots, dtype=int)
+    active = y >= 0
+
+    while t < max_time and active.any():
+        t += dt
+        idx = np.flatnonzero(active)
+        if drag is None:
+            x_new = x[idx] + dt * vx[idx]
+            vy_new = vy[idx] + dt * -g[idx]
+        else:
+            # same operation order as the scalar loop, so every lane matches simulate_projectile
+            ax, ay = drag.acceleration(vx[idx], vy[idx], y[idx], x[idx])
+            vx_new = vx[idx] + dt * ax
+            x_new = x[idx] + dt * vx_new
+            vy_new = (vy[idx] + dt * ay) + dt * -g[idx]
+            vx[idx] = vx_new # a landed lane's velocity is never read again
+        y_new = y[idx] + dt * vy_new
+
+        # shots that crossed the ground this step get the same linear impact correction
+        landed = y_new < 0
+        if landed.any():
+            li = idx[landed]
+            frac = y[li] / (y[li] - y_new[landed])
+            x[li] = x[li] + frac * (x_new[landed] - x[li])
+            active[li] = False
+            if return_trajectory:
+                x_log[-1][li] = x[li]
+            else:
+                # the last sample goes to the ground, so if it was the apex the one before takes over
+                lost = li[apex_t[li] == t_end[li]]
+                apex_y[lost] = np.where(t_end[lost] > 0, before_y[lost], 0.0)
+                apex_t[lost] = np.where(t_end[lost] > 0, before_t[lost], 0.0)
+
+        # only lanes still in flight record this step
+        flying = idx[~landed]
+        if not return_trajectory:
+            before_y[flying], before_t[flying] = y[flying], t_end[flying]
+        x[flying] = x_new[~landed]
+        vy[flying] = vy_new[~landed]
+        y[flying] = y_new[~landed]
+        lengths[flying] += 1
+
+        if return_trajectory:
+            # snapshot the whole batch; entries past a shot's length are masked out below
+            time_log.append(t)
+            x_log.append(x.copy())
+            y_log.append(y.copy())
+            vy_log.append(vy.copy())
+        else:
+            t_end[flying] = t
+            higher = flying[y[flying] > apex_y[flying]]
+            apex_y[higher], apex_t[higher] = y[higher], t
+
+    if not return_trajectory:
+        return x, t_end, apex_y, apex_t
+
+    valid = np.arange(len(time_log)) < lengths[:, None]
+    times = np.where(valid, np.asarray(time_log)[None, :], np.nan)
+    xs = np.where(valid, np.stack(x_log, axis=1), np.nan)
+    ys = np.where(valid, np.stack(y_log, axis=1), np.nan)
+    vys = np.where(valid, np.stack(vy_log, axis=1), np.nan)
+
+    # final sample of a landed shot sits on the ground, as in the scalar version
+    grounded = np.flatnonzero(~active & (y0 >= 0))
+    ys[grounded, lengths[grounded] - 1] = 0
+    return times, xs, ys, vys, lengths
+
+
+def aim_batch(speeds, target_xs, arc = "low", tol = 0.05, max_iters = 50, dt = 0.01, g = 9.81, y0 = 0, drag = None):
+
+    """
+    Solves launch angles for many targets at once. Each iteration fires every unconverged lane
+    through simulate_projectiles (impact only) and updates its Illinois (regula falsi) bracket on the
+    chosen arc; lanes leave the active set as soon as they are within tol.
+    Returns arrays angles (NaN where the arc cannot reach the target), errors (|miss| at the
+    returned angle, or at the closest shot tried when unreachable) and iterations (shots per target).
+    With drag the arcs are split at the numerically found max-range angle of each speed.
+    """
+
+    if arc not in ("low", "high", "fastest"):
+        raise ValueError(f"Unknown arc {arc!r}; expected 'low', 'high' or 'fastest'")
+    speeds, target_xs = np.broadcast_arrays(np.atleast_1d(np.asarray(speeds, dtype=float)),
+                                            np.atleast_1d(np.asarray(target_xs, dtype=float)))
+    speeds, target_xs = speeds.ravel(), target_xs.ravel()
+    n = speeds.size
+
+    max_time = _flight_time_bound(speeds, g, y0)
+
+    def residual(lanes, angles):
+        impact_x, _, _, _ = simulate_projectiles(speeds[lanes], angles, dt=dt, g=g, y0=y0, max_time=max_time,
+                                                 return_trajectory=False, drag=drag)
+        return impact_x - target_xs[lanes]
+
+    # range grows on the low arc [0°, θmax] and shrinks on the high arc [θmax, 90°]; "fastest" is the low arc
+    if drag is None:
+        split = np.degrees(np.arctan2(speeds, np.sqrt(np.maximum(speeds**2 + 2 * g * y0, 0.0))))
+    else:
+        split = _max_range_angles(speeds, g, y0, drag, dt)
+    edge = np.full(n, 90.0 if arc == "high" else 0.0)
+    lanes = np.arange(n)
+    f_split = residual(lanes, split)
+    f_edge = residual(lanes, edge)
+
+    angles = np.full(n, np.nan)
+    errors = np.minimum(np.abs(f_split), np.abs(f_edge))
+    iterations = np.full(n, 2)
+    hit_split = np.abs(f_split) <= tol
+    hit_edge = ~hit_split & (np.abs(f_edge) <= tol)
+    angles[hit_split], errors[hit_split] = split[hit_split], np.abs(f_split[hit_split])
+    angles[hit_edge], errors[hit_edge] = edge[hit_edge], np.abs(f_edge[hit_edge])
+
+    # target beyond the max range, or short of what the arc's edge already reaches: no root on this arc
+    active = ~hit_split & ~hit_edge & (f_split > 0) & (f_edge < 0)
+    a, fa = edge.copy(), f_edge.copy()
+    b, fb = split.copy(), f_split.copy()
+
+    for _ in range(max_iters - 2):
+        lanes = np.flatnonzero(active)
+        if lanes.size == 0:
+            break
+        c = b[lanes] - fb[lanes] * (b[lanes] - a[lanes]) / (fb[lanes] - fa[lanes])
+        fc = residual(lanes, c)
+        iterations[lanes] += 1
+
+        # Illinois update: keep the bracket, halving the stale end's value when it is kept twice
+        flipped = fc * fb[lanes] < 0
+        a[lanes[flipped]], fa[lanes[flipped]] = b[lanes[flipped]], fb[lanes[flipped]]
+        fa[lanes[~flipped]] *= 0.5
+        b[lanes], fb[lanes] = c, fc
+
+        done = np.abs(fc) <= tol
+        angles[lanes[done]], errors[lanes[done]] = c[done], np.abs(fc[done])
+        active[lanes[done]] = False
+
+    # lanes that ran out of iterations report their best estimate
+    angles[active], errors[active] = b[active], np.abs(fb[active])
+    return angles, errors, iterations
+
+
+def simulate_projectiles_3d(speeds, elevations_deg, azimuths_deg = 0.0, dt = 0.01, g = 9.81, y0 = 0, max_time = 10,
+                            return_trajectory = True, drag = None, wind = None):
+
+    """
+    3D version of simulate_projectiles. x points down the azimuth-0 firing line, y up and z across it;
+    each shot leaves at an elevation above the horizon and an azimuth turned from +x towards +z.
+    The state lives in one contiguous (6, N) structure-of-arrays block with rows x, y, z, vx, vy, vz and
+    is stepped with the same Euler scheme and linear impact correction, so at azimuth 0 in calm air
+    (or a wind with no z component) every lane matches simulate_projectiles exactly.
+    drag and wind act on the full 3D air-relative velocity, so a crosswind drifts the shot sideways.
+    Returns padded (N, M) arrays times, xs, ys, zs plus lengths, or with return_trajectory=False the
+    per-shot arrays impact_x, impact_z, flight_time, apex_height and apex_time.
+    """
+
+    drag = _with_wind(drag, wind)
+    speeds, elevations_deg, azimuths_deg, y0, g = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (speeds, elevations_deg, azimuths_deg, y0, g)))
+    speeds, elevations_deg, azimuths_deg, y0, g = (a.ravel() for a in (speeds, elevations_deg, azimuths_deg, y0, g))
+    n_shots = speeds.size
+
+    elevation, azimuth = np.radians(elevations_deg), np.radians(azimuths_deg)
+    horizontal = speeds * np.cos(elevation)
+    state = np.zeros((6, n_shots)) # rows x, y, z, vx, vy, vz
+    state[1] = y0
+    state[3] = horizontal * np.cos(azimuth)
+    state[4] = speeds * np.sin(elevation)
+    state[5] = horizontal * np.sin(azimuth)
+
+    t = 0.0
+    if return_trajectory:
+        time_log = [t]
+        position_log = [state[:3].copy()]
+    else:
+        t_end = np.zeros(n_shots)
+        apex_y, apex_t = y0.copy(), np.zeros(n_shots)
+        before_y, before_t = y0.copy(), np.zeros(n_shots)
+    lengths = np.ones(n_shots, dtype=int)
+    active = state[1] >= 0
+
+    while t < max_time and active.any():
+        t += dt
+        idx = np.flatnonzero(active)
+        x, y, z, vx, vy, vz = state[:, idx] # one gather of the active columns
+        if drag is not None:
+            ax, ay, az = drag.acceleration_3d(vx, vy, vz, x, y, z)
+            vx = vx + dt * ax
+            vy = vy + dt * ay
+            vz = vz + dt * az
+        x_new = x + dt * vx
+        z_new = z + dt * vz
+        vy = vy + dt * -g[idx]
+        y_new = y + dt * vy
+
+        landed = y_new < 0
+        if landed.any():
+            li = idx[landed]
+            frac = y[landed] / (y[landed] - y_new[landed])
+            state[0, li] = x[landed] + frac * (x_new[landed] - x[landed])
+            state[2, li] = z[landed] + frac * (z_new[landed] - z[landed])
+            active[li] = False
+            if return_trajectory:
+                position_log[-1][0, li] = state[0, li]
+                position_log[-1][2, li] = state[2, li]
+            else:
+                lost = li[apex_t[li] == t_end[li]]
+                apex_y[lost] = np.where(t_end[lost] > 0, before_y[lost], 0.0)
+                apex_t[lost] = np.where(t_end[lost] > 0, before_t[lost], 0.0)
+
+        keep = ~landed
+        flying = idx[keep]
+        if not return_trajectory:
+            before_y[flying], before_t[flying] = y[keep], t_end[flying]
+        state[:, flying] = np.stack((x_new, y_new, z_new, vx, vy, vz))[:, keep]
+        lengths[flying] += 1
+
+        if return_trajectory:
+            time_log.append(t)
+            position_log.append(state[:3].copy())
+        else:
+            t_end[flying] = t
+            higher = flying[state[1, flying] > apex_y[flying]]
+            apex_y[higher], apex_t[higher] = state[1, higher], t
+
+    if not return_trajectory:
+        return state[0].copy(), state[2].copy(), t_end, apex_y, apex_t
+
+    valid = np.arange(len(time_log)) < lengths[:, None]
+    times = np.where(valid, np.asarray(time_log)[None, :], np.nan)
+    xs, ys, zs = np.where(valid, np.stack(position_log, axis=2), np.nan)
+
+    grounded = np.flatnonzero(~active & (y0 >= 0))
+    ys[grounded, lengths[grounded] - 1] = 0
+    return times, xs, ys, zs, lengths
+
+
+def simulate_projectile_3d(speed = 5, elevation_deg = 45, azimuth_deg = 0, dt = 0.01, g = 9.81, y0 = 0, max_time = 10,
+                           return_trajectory = True, drag = None, wind = None):
+
+    """
+    Single-shot 3D simulation on simulate_projectiles_3d. Returns arrays times, xs, ys, zs, or with
+    return_trajectory=False the floats impact_x, impact_z, flight_time, apex_height and apex_time.
+    """
+
+    result = simulate_projectiles_3d(speed, elevation_deg, azimuth_deg, dt=dt, g=g, y0=y0, max_time=max_time,
+                                     return_trajectory=return_trajectory, drag=drag, wind=wind)
+    if not return_trajectory:
+        return tuple(float(a[0]) for a in result)
+    times, xs, ys, zs, lengths = result
+    n = lengths[0]
+    return times[0, :n], xs[0, :n], ys[0, :n], zs[0, :n]
+
+
+def aim_3d(speeds, target_xs, target_zs, arc = "low", tol = 0.05, max_iters = 20, dt = 0.01, g = 9.81, y0 = 0,
+           drag = None, wind = None, step_deg = 0.1):
+
+    """
+    Solves azimuth and elevation for many ground targets (target_x downrange, target_z across) at once.
+    Each iteration is a Newton step on the 2D miss (x, z) whose Jacobian comes from forward differences:
+    every unconverged lane fires its current aim plus an azimuth- and an elevation-nudged shot
+    (step_deg apart), all in a single simulate_projectiles_3d call.
+    The first guess points straight at the target with the vacuum elevation for its ground distance;
+    elevations stay on the chosen arc ("low" below the max-range angle, "high" above it).
+    Returns arrays azimuths, elevations (NaN where no aim within tol was found), errors (miss distance
+    of the best shot) and iterations (batched rounds per target, three shots each).
+    """
+
+    if arc not in ("low", "high"):
+        raise ValueError(f"Unknown arc {arc!r}; expected 'low' or 'high'")
+    drag = _with_wind(drag, wind)
+    speeds, target_xs, target_zs = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(a, dtype=float)) for a in (speeds, target_xs, target_zs)))
+    speeds, target_xs, target_zs = (a.ravel() for a in (speeds, target_xs, target_zs))
+    n = speeds.size
+
+    max_time = _flight_time_bound(speeds, g, y0)
+    if drag is None:
+        split = np.degrees(np.arctan2(speeds, np.sqrt(np.maximum(speeds**2 + 2 * g * y0, 0.0))))
+    else:
+        split = _max_range_angles(speeds, g, y0, drag, dt)
+    lo, hi = (np.zeros(n), split) if arc == "low" else (split, np.full(n, 90.0))
+
+    azimuth = np.degrees(np.arctan2(target_zs, target_xs))
+    guess, _ = angle_for_target_x_batch(speeds, np.hypot(target_xs, target_zs), g)
+    elevation = guess[:, 0 if arc == "low" else 1]
+    elevation = np.clip(np.where(np.isnan(elevation), split, elevation), lo, hi)
+
+    best_az, best_el, errors = azimuth.copy(), elevation.copy(), np.full(n, np.inf)
+    iterations = np.zeros(n, dtype=int)
+    converged = np.zeros(n, dtype=bool)
+    active = np.ones(n, dtype=bool)
+
+    for _ in range(max_iters):
+        lanes = np.flatnonzero(active)
+        if lanes.size == 0:
+            break
+        k = lanes.size
+        az, el = azimuth[lanes], elevation[lanes]
+        # nudge the elevation downwards where an upward nudge would leave 90°
+        h_el = np.where(el + step_deg <= 90.0, step_deg, -step_deg)
+        impact_x, impact_z, _, _, _ = simulate_projectiles_3d(
+            np.tile(speeds[lanes], 3), np.concatenate((el, el, el + h_el)),
+            np.concatenate((az, az + step_deg, az)), dt=dt, g=g, y0=y0, max_time=max_time,
+            return_trajectory=False, drag=drag)
+        iterations[lanes] += 1
+
+        rx, rz = impact_x[:k] - target_xs[lanes], impact_z[:k] - target_zs[lanes]
+        miss = np.hypot(rx, rz)
+        better = miss < errors[lanes]
+        best_az[lanes[better]], best_el[lanes[better]], errors[lanes[better]] = az[better], el[better], miss[better]
+
+        done = miss <= tol
+        converged[lanes[done]] = True
+        active[lanes[done]] = False
+
+        # 2x2 Newton step: J = [[dx/daz, dx/del], [dz/daz, dz/del]]
+        j11 = (impact_x[k:2 * k] - impact_x[:k]) / step_deg
+        j21 = (impact_z[k:2 * k] - impact_z[:k]) / step_deg
+        j12 = (impact_x[2 * k:] - impact_x[:k]) / h_el
+        j22 = (impact_z[2 * k:] - impact_z[:k]) / h_el
+        det = j11 * j22 - j12 * j21
+        with np.errstate(divide="ignore", invalid="ignore"):
+            d_az = (-j22 * rx + j12 * rz) / det
+            d_el = (j21 * rx - j11 * rz) / det
+        # a singular Jacobian (at the max-range angle) falls back to no step; large steps are capped at 10°
+        d_az = np.clip(np.nan_to_num(d_az, nan=0.0, posinf=0.0, neginf=0.0), -10.0, 10.0)
+        d_el = np.clip(np.nan_to_num(d_el, nan=0.0, posinf=0.0, neginf=0.0), -10.0, 10.0)
+        step = ~done
+        azimuth[lanes[step]] = az[step] + d_az[step]
+        elevation[lanes[step]] = np.clip(el[step] + d_el[step], lo[lanes[step]], hi[lanes[step]])
+
+    azimuths = np.where(converged, best_az, np.nan)
+    elevations = np.where(converged, best_el, np.nan)
+    return azimuths, elevations, errors, iterations
+
+
+def plot_position(x_positions, y_positions):
+
+    """Plots the projectile’s trajectory."""
+
+    plt.plot(x_positions, y_positions, label="projectile trajectory")
+    plt.axhline(0, color="k", lw=1)
+    plt.xlabel("x (m)")
+    plt.ylabel("y (m)")
+    plt.title("Projectile's Position(no drag)")
+    plt.grid(True)
+    plt.legend()
+    plt.show()
+    
+
+def plot_velocity(times, y_velocities):
+
+    """Plots the projectile’s velocity."""
+
+    plt.plot(times, y_velocities, label= "projectile speed")
+    plt.axhline(0, color= "c", lw=1)
+    plt.xlabel("t (s)")
+    plt.ylabel("vertical velocity (m/s)")
+    plt.title("Projectile's Velocity Over Time")
+    plt.grid(True)
+    plt.legend()
+    plt.show()
+
+
+def compare_to_analytic(speed, angle_deg, g, sim_metrics):
+
+    """Compare simulated results to physics formulas."""
+
+    theta = math.radians(angle_deg)
+    H_theory = (speed**2 * math.sin(theta)**2) / (2*g)
+    T_theory = (2 * speed * math.sin(theta)) / g
+    R_theory = (speed**2 * math.sin(2*theta)) / g
+
+    print("\nTheoretical Values\n"
+        f"- Max height (theory): {H_theory:.2f} m\n"
+        f"- Range (theory):      {R_theory:.2f} m\n"
+        f"- Flight time (theory):{T_theory:.2f} s\n")
+    
+
+def compare_integrators(speed, angle_deg, g = 9.81, dts = (0.01, 0.05, 0.1, 0.25, 0.5), engines = ("euler", "verlet")):
+
+    """
+    Prints the range error against the analytic range, and the number of steps taken,
+    for each engine at each dt. Returns the rows as a list of dicts.
+    """
+
+    compare_to_analytic(speed, angle_deg, g, None)
+    R_theory = (speed**2 * math.sin(2 * math.radians(angle_deg))) / g
+
+    rows = []
+    print(f"{'engine':<8} {'dt (s)':>7} {'steps':>6} {'range error (m)':>16}")
+    for engine in engines:
+        for dt in dts:
+            times, xs, _, _ = simulate_projectile(speed, angle_deg, dt=dt, g=g, engine=engine)
+            row = {"engine": engine, "dt": dt, "steps": len(times), "range_error": abs(xs[-1] - R_theory)}
+            rows.append(row)
+            print(f"{engine:<8} {dt:>7.3f} {row['steps']:>6} {row['range_error']:>16.5f}")
+    return rows
+
+
+def compute_metrics(times, xs, ys):
+
+    """Compute and print metrics from simulation."""
+
+
+    max_y = np.max(ys)
+    t_at_max_y = times[np.argmax(ys)]
+    x_range = xs[-1]
+    flight_time = times[-1]
+    print("\nSimulated Values\n"
+        f"Maximum height reached: {max_y:.2f} at Time t = {t_at_max_y:.2f} s\n"
+        f"Horizontal Distance Aquired: {x_range:.2f} m\n"
+        f"Total Flight Time: {flight_time:.2f} s\n")
+
+
+def solve_angles(S):
+
+    """Return two angles θ₁ and θ₂ (degrees) that satisfy sin(2θ)=S."""
+    
+    # keep S inside [-1,1]
+    S = max(-1.0, min(1.0, S))
+    a = math.asin(S)  # a = 2θ₁
+    b = math.pi - a  # second solution for 2θ
+    th1 = math.degrees(a/2.0)
+    th2 = math.degrees(b/2.0)
+    return sorted({round(th1, 6), round(th2, 6)})
+
+
+def angle_for_target_x(speed, target_x, g=9.81):
+
+    """
+    Compute launch angle(s) (deg) that hit a horizontal target at x = target_x, assuming level ground and no air drag.
+    Returns a list of 0–2 angles.
+    While enable_cache() is active, results are memoized; the "Target too far" message is printed when
+    the result is computed, and a hit returns the empty list silently.
+    """
+
+    if _cache_active():
+        return _CACHE.fetch(angle_for_target_x, dict(speed=speed, target_x=target_x, g=g))
+    R_max = (speed**2) / g
+    if target_x < 0 or target_x > R_max:
+        print("Target too far for this speed.")
+        return []
+
+    S = (g * target_x) / (speed**2)
+    return solve_angles(S)
+
+
+def range_derivative(speed, angle_deg, g = 9.81, y0 = 0):
+
+    """
+    Analytic dR/dθ of the no-drag range R(θ) = v·cosθ·(v·sinθ + √(v²·sin²θ + 2·g·y0)) / g,
+    in metres per degree.
+    """
+
+    theta = math.radians(angle_deg)
+    s, c = math.sin(theta), math.cos(theta)
+    root = math.sqrt(max(speed**2 * s * s + 2 * g * y0, 0.0))
+    if root == 0:
+        dR = 2 * speed**2 * math.cos(2 * theta) / g # launched from the ground: R = v²·sin(2θ)/g
+    else:
+        dR = speed * (-s * (speed * s + root) + c * (speed * c + speed**2 * s * c / root)) / g
+    return dR * math.pi / 180
+
+
+def _newton_step(miss, slope, max_step = 10.0):
+
+    """Angle correction miss / slope in degrees, limited to max_step where the range curve goes flat."""
+
+    if slope == 0:
+        return math.copysign(max_step, miss)
+    return max(-max_step, min(max_step, miss / slope))
+
+
+def max_range_angle(speed, g = 9.81, y0 = 0, drag = None, dt = 0.01):
+
+    """
+    Launch angle (deg) with the longest range from height y0. Without drag it is analytic,
+    tanθ = v / √(v² + 2·g·y0); with drag it is searched numerically on the Euler engine at step dt.
+    """
+
+    if drag is not None:
+        return float(_max_range_angles(speed, g, y0, drag, dt)[0])
+    return math.degrees(math.atan2(speed, math.sqrt(max(speed**2 + 2 * g * y0, 0.0))))
+
+
+def _max_range_angles(speeds, g, y0, drag, dt, tol = 1e-3):
+
+    """
+    Max-range angle of every speed under drag, by golden-section search on [0°, 90°] where range is
+    unimodal in angle. All speeds are searched together, one batched simulation per iteration.
+    """
+
+    speeds = np.atleast_1d(np.asarray(speeds, dtype=float)).ravel()
+    inv_phi = (math.sqrt(5) - 1) / 2
+    max_time = _flight_time_bound(speeds, g, y0)
+
+    def ranges(angles):
+        return simulate_projectiles(speeds, angles, dt=dt, g=g, y0=y0, max_time=max_time, return_trajectory=False,
+                                    drag=drag)[0]
+
+    a, b = np.zeros(speeds.size), np.full(speeds.size, 90.0)
+    c, d = b - inv_phi * (b - a), a + inv_phi * (b - a)
+    fc, fd = ranges(c), ranges(d)
+    for _ in range(int(math.ceil(math.log(tol / 90.0) / math.log(inv_phi)))):
+        # keep the side with the larger range; its interior point is reused and one new point is fired
+        left = fc >= fd
+        a, b = np.where(left, a, c), np.where(left, d, b)
+        kept, f_kept = np.where(left, c, d), np.where(left, fc, fd)
+        new = np.where(left, b - inv_phi * (b - a), a + inv_phi * (b - a))
+        f_new = ranges(new)
+        c, fc = np.where(left, new, kept), np.where(left, f_new, f_kept)
+        d, fd = np.where(left, kept, new), np.where(left, f_kept, f_new)
+    return 0.5 * (a + b)
+
+
+def _flight_time_bound(speeds, g, y0):
+
+    """
+    Max flight time any shot at these speeds can need: the no-drag flight straight up, plus 1%.
+    Drag only shortens flights, so the aiming code uses it as max_time and never cuts a shot short.
+    """
+
+    speed = float(np.max(np.abs(speeds)))
+    if g <= 0:
+        return 10.0 # no landing to bound; keep the engines' default
+    return 1.01 * (speed + math.sqrt(max(speed**2 + 2 * g * y0, 0.0))) / g
+
+
+def _aim_bracketed(shoot, speed, arc, tol, max_iters, g = 9.81, y0 = 0, drag = None, verbose = True):
+
+    """
+    Brent search on one arc for iterative_aim. shoot(angle) fires and returns the miss.
+    The low arc is [0°, θmax] and the high arc [θmax, 90°], where range is monotonic.
+    "fastest" uses the low arc, which always has the shorter flight for a given range.
+    verbose=False drops the unreachable-target messages.
+    """
+
+    split = max_range_angle(speed, g, y0, drag)
+    miss_split = shoot(split)
+    if abs(miss_split) <= tol:
+        return
+    if miss_split > 0:
+        if verbose:
+            print("Target too far for this speed.")
+        return
+
+    edge = 90.0 if arc == "high" else 0.0
+    miss_edge = shoot(edge)
+    if abs(miss_edge) <= tol:
+        return
+    if miss_edge < 0:
+        if verbose:
+            print(f"Target too close for the {arc} arc.")
+        return
+    # root of impact_x - target_x = -miss, which is negative at the edge and positive at the split
+    _brent(lambda angle: -shoot(angle), edge, split, -miss_edge, -miss_split, tol, max_iters - 2)
+
+
+def _brent(f, a, b, fa, fb, ftol, max_evals, xtol = 1e-9):
+
+    """
+    Brent's method for a root of f bracketed by [a, b] (fa and fb of opposite sign): inverse quadratic
+    or secant steps, falling back to bisection whenever they do not shrink the bracket fast enough.
+    Stops once |f| <= ftol or after max_evals evaluations, and returns the last estimate.
+    """
+
+    if abs(fa) < abs(fb):
+        a, b, fa, fb = b, a, fb, fa
+    c, fc, d = a, fa, a
+    bisected = True
+    for _ in range(max_evals):
+        if fa != fc and fb != fc:
+            s = (a * fb * fc / ((fa - fb) * (fa - fc)) + b * fa * fc / ((fb - fa) * (fb - fc))
+                 + c * fa * fb / ((fc - fa) * (fc - fb)))
+        else:
+            s = b - fb * (b - a) / (fb - fa)
+        lo, hi = sorted(((3 * a + b) / 4, b))
+        if (not lo <= s <= hi
+                or (bisected and abs(s - b) >= abs(b - c) / 2)
+                or (not bisected and abs(s - b) >= abs(c - d) / 2)
+                or (bisected and abs(b - c) < xtol)
+                or (not bisected and abs(c - d) < xtol)):
+            s = (a + b) / 2
+            bisected = True
+        else:
+            bisected = False
+        fs = f(s)
+        if abs(fs) <= ftol:
+            return s
+        d, c, fc = c, b, fb
+        if fa * fs < 0:
+            b, fb = s, fs
+        else:
+            a, fa = s, fs
+        if abs(fa) < abs(fb):
+            a, b, fa, fb = b, a, fb, fa
+    return b
+
+
+def solve_angles_batch(S):
+
+    """
+    Array version of solve_angles: for each S, the angles θ₁ ≤ θ₂ (degrees) with sin(2θ) = S.
+    Returns an (N, 2) array of [low, high] angles; S is clipped to [-1, 1] as in solve_angles.
+    """
+
+    a = np.arcsin(np.clip(np.ravel(np.asarray(S, dtype=float)), -1.0, 1.0)) # a = 2θ₁
+    return np.degrees(np.stack((a / 2.0, (np.pi - a) / 2.0), axis=1))
+
+
+def angle_for_target_x_batch(speeds, target_xs, g = 9.81):
+
+    """
+    Array version of angle_for_target_x for level ground and no drag, without printing.
+    speeds and target_xs broadcast together. Returns an (N, 2) array of [low, high] angles
+    (NaN where the target is out of reach) and the boolean reachable mask.
+    """
+
+    speeds, target_xs = np.broadcast_arrays(np.atleast_1d(np.asarray(speeds, dtype=float)),
+                                            np.atleast_1d(np.asarray(target_xs, dtype=float)))
+    speeds, target_xs = speeds.ravel(), target_xs.ravel()
+    R_max = speeds**2 / g
+    reachable = (target_xs >= 0) & (target_xs <= R_max)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        S = g * target_xs / speeds**2
+    # a shell fired at zero speed lands where it starts, like a zero-range target at any speed
+    S[reachable & (speeds == 0)] = 0.0
+    angles = solve_angles_batch(S)
+    angles[~reachable] = np.nan
+    return angles, reachable
+
+
+def demo_target_hit():
+
+    """Demonstrate angles that hit a given target distance."""
+    
+    speed = 25.0
+    target_x = 50.0
+    angles = angle_for_target_x(speed, target_x)
+
+    if not angles:
+        return  # no valid angles for this speed
+
+    plt.figure()
+    for a in angles:
+        t, xs, ys, _ = simulate_projectile(speed=speed, angle_deg=a, dt=0.01)
+        plt.plot(xs, ys, label=f"{a:.2f}°")
+
+    # Plotting the trajectories of the two angles hit the target x distance
+    plt.axvline(target_x, color="g", linestyle="--", label="target")
+    plt.xlabel("x (m)")
+    plt.ylabel("y (m)")
+    plt.title("Angles That Hit the Target (no drag)")
+    plt.legend()
+    plt.grid(True)
+    plt.show()
+
+
+def iterative_aim(speed, target_x, initial_angle, learn_rate = 0.05, max_iters = 10, tol = 0.05, plot = True,
+                  engine = "euler", backend = "simulate", method = "log1p", arc = "low", g = 9.81, y0 = 0,
+                  fidelity = "fixed", drag = None):
+
+    """
+    Repeatedly adjust angle to make projectile hit the target.
+    Returns final_angle and a history list of attempts.
+    method picks the angle correction after each miss:
+    - "log1p": fixed step learn_rate * sign(miss) * log1p(|miss|)
+    - "newton": miss / dR/dθ with the analytic range derivative, or under drag a finite difference from
+      an extra shot 0.1° away (its steps are counted with the shot it serves)
+    - "secant": slope through the last two shots (the Newton slope for the first correction)
+    - "brent": bracketed Brent root-finding on one arc, split at the max-range angle; arc is
+      "low", "high" or "fastest" and initial_angle is not used. Converges whenever the arc
+      can reach the target and stops after one shot when it cannot.
+    Each shot is simulated with the coarsest step whose impact error stays within half of tol.
+    fidelity="multi" loosens that budget to a tenth of the expected miss (the previous miss, the best
+    miss so far for "brent", or the analytic no-drag miss for the first shot), so far-off tries run on a
+    coarse step; a coarse shot that lands within tol plus twice its budget is fired again at full accuracy,
+    and only that verification shot can end the search.
+    The returned angle is always the best full-accuracy shot; if none is within tol, the best unverified
+    angle is fired at full accuracy before returning.
+    Every history entry records the integration steps it cost under "steps", and the total is printed.
+    backend="richardson" estimates each impact with richardson_impact instead of one full simulation.
+    g and y0 set the gravity and launch height used for every shot, and drag (a Drag) adds air resistance.
+    Set plot=False to skip the convergence figures (and the trajectory re-simulations behind them).
+    While enable_cache() is active, calls with plot=False are memoized; a hit returns a copy of the
+    stored history without firing or printing.
+    """
+
+    if _cache_active() and not plot:
+        return _CACHE.fetch(iterative_aim, dict(speed=speed, target_x=target_x, initial_angle=initial_angle,
+                            learn_rate=learn_rate, max_iters=max_iters, tol=tol, plot=plot, engine=engine,
+                            backend=backend, method=method, arc=arc, g=g, y0=y0, fidelity=fidelity, drag=drag))
+    if backend not in ("simulate", "richardson"):
+        raise ValueError(f"Unknown backend {backend!r}; expected 'simulate' or 'richardson'")
+    if method not in ("log1p", "newton", "secant", "brent"):
+        raise ValueError(f"Unknown method {method!r}; expected 'log1p', 'newton', 'secant' or 'brent'")
+    if arc not in ("low", "high", "fastest"):
+        raise ValueError(f"Unknown arc {arc!r}; expected 'low', 'high' or 'fastest'")
+    if fidelity not in ("fixed", "multi"):
+        raise ValueError(f"Unknown fidelity {fidelity!r}; expected 'fixed' or 'multi'")
+    x_tol = 0.5 * tol # error budget for the simulated impact itself
+    max_time = _flight_time_bound(speed, g, y0)
+    history = []
+    step_memo = {} # budget -> [(angle, dt)] chosen under drag, shared by this solve's shots
+
+    def landing(angle, budget):
+
+        """Impact x of one shot with the given impact error budget, and the integration steps it took."""
+
+        # only the landing point is needed here
+        stats = {}
+        if backend == "richardson":
+            impact_x, _ = richardson_impact(speed, angle, g=g, y0=y0, max_time=max_time, x_tol=budget, stats=stats,
+                                            drag=drag)
+        else:
+            impact_x, _, _, _ = _impact_for_budget(step_memo, speed, angle, budget, g, y0, max_time, engine, stats,
+                                                   drag)
+        return impact_x, stats["steps"]
+
+    def fire(angle, budget):
+
+        """Fires one shot with the given impact error budget, records it in history and returns the miss."""
+
+        impact_x, steps = landing(angle, budget)
+        miss = target_x - impact_x
+        history.append({"try": len(history)+1, "angle": angle, "impact_x": impact_x, "miss": miss,
+                        "x_tol": budget, "steps": steps})
+        return miss
+
+    def slope_at(angle):
+
+        """
+        dR/dθ (m/deg) for a Newton step: analytic without drag, otherwise a forward difference from a shot
+        0.1° away at the last shot's budget, whose steps are added to that shot's entry.
+        """
+
+        if drag is None:
+            return range_derivative(speed, angle, g, y0)
+        h = 0.1 if angle + 0.1 <= 90.0 else -0.1
+        impact_x, steps = landing(angle + h, history[-1]["x_tol"])
+        history[-1]["steps"] += steps
+        return (impact_x - history[-1]["impact_x"]) / h
+
+    evaluations = 0 # solver evaluations; a verified coarse shot counts once
+
+    def shoot(angle):
+
+        """Fires at the current fidelity; a coarse shot that looks converged is verified at full accuracy."""
+
+        nonlocal evaluations
+        evaluations += 1
+        if fidelity == "fixed":
+            return fire(angle, x_tol)
+        if history and method == "brent":
+            # Brent's next point may sit anywhere in the bracket, but should beat the best shot so far
+            expected = min(abs(h["miss"]) for h in history)
+        elif history:
+            expected = abs(history[-1]["miss"])
+        else:
+            theta = math.radians(angle)
+            vy = speed * math.sin(theta)
+            expected = abs(target_x - speed * math.cos(theta) * (vy + math.sqrt(max(vy * vy + 2 * g * y0, 0.0))) / g)
+        budget = max(x_tol, 0.1 * expected)
+        miss = fire(angle, budget)
+        # a coarse miss is only passed on when its sign survives twice the budget's error, so Brent's
+        # bracket stays valid; anything closer is fired again at full accuracy
+        if budget > x_tol and abs(miss) <= tol + 2 * budget:
+            miss = fire(angle, x_tol)
+        return miss
+
+    if method == "brent":
+        _aim_bracketed(shoot, speed, arc, tol, max_iters, g, y0, drag)
+    else:
+        angle = initial_angle
+        for i in range(max_iters):
+            miss = shoot(angle)
+            if abs(miss) <= tol:
+                break
+            elif method == "log1p":
+                angle += learn_rate * np.sign(miss) * math.log1p(abs(miss))
+            else:
+                previous = history[-2] if len(history) > 1 else None
+                if method == "secant" and previous is not None and previous["angle"] != angle:
+                    slope = (history[-1]["impact_x"] - previous["impact_x"]) / (angle - previous["angle"])
+                else:
+                    slope = slope_at(angle)
+                angle += _newton_step(miss, slope)
+            angle = max(0.0, min(85.0, angle))
+            print(f"Try {i+1}: angle={angle:.2f}°, miss={miss:.2f} m") # prints the real-time state of the system
+    # only shots fired at the full accuracy budget can be the answer; coarse misses were never checked,
+    # so if no verified shot is within tol the closest unverified angle is fired at full accuracy first
+    verified = [h for h in history if h["x_tol"] <= x_tol]
+    best_verified = min((abs(h["miss"]) for h in verified), default=math.inf)
+    if best_verified > tol:
+        checked = {h["angle"] for h in verified}
+        unchecked = [h for h in history if h["angle"] not in checked and abs(h["miss"]) < best_verified]
+        if unchecked:
+            fire(min(unchecked, key=lambda h: abs(h["miss"]))["angle"], x_tol)
+            verified.append(history[-1])
+    best = min(verified, key=lambda h: abs(h["miss"]))
+    if abs(best["miss"]) > tol and evaluations >= max_iters:
+        print(f"Warning: Did not converge within {max_iters} iterations.")
+
+
+    if plot:
+        # Visualization of angle correction
+        plt.figure()
+        for attempt in history:
+            t, xs, ys, _ = simulate_projectile(speed=speed, angle_deg=attempt["angle"], g=g, y0=y0,
+                                               max_time=max_time, engine=engine, x_tol=x_tol, drag=drag)
+            plt.plot(xs, ys, label=f"Try {attempt['try']}: {attempt['angle']:.1f}° (miss={attempt['miss']:.2f})")
+        plt.axvline(target_x, color="g", linestyle="--", label=f"Target ({target_x} m)")
+        plt.xlabel("x (m)")
+        plt.ylabel("y (m)")
+        plt.legend()
+        plt.grid(True)
+        plt.title("Iterative Aiming Convergence")
+        plt.show()
+
+        plt.figure()
+        plt.plot(range(1, len(history)+1), [h["miss"] for h in history], 'o-')
+        plt.axhline(0, color='k', lw=1)
+        plt.xlabel("Iteration")
+        plt.ylabel("Miss (m)")
+        plt.title("Miss Convergence Over Iterations")
+        plt.grid(True)
+        plt.show()
+
+        plt.figure()
+        plt.plot([h["try"] for h in history], [h["angle"] for h in history], 'o-')
+        plt.xlabel("Iteration")
+        plt.ylabel("Launch Angle (°)")
+        plt.title("Angle Adjustment Over Time")
+        plt.grid(True)
+        plt.show()
+    
+    errors = [abs(h["miss"]) for h in history]
+    print("Miss magnitudes per try:", np.round(errors, 2)) # Prints summary of absolute errors using history list
+    print(f"Integration steps: {sum(h['steps'] for h in history)}")
+
+    return best["angle"], history, abs(best["miss"])
+
+
+class Aimer:
+
+    """
+    Warm-started aiming for a sequence of nearby targets at one muzzle speed.
+    Remembers the last solution and the local slope dR/dθ (m/deg), so each new target starts from the
+    first-order prediction angle + (target_x - last_impact_x) / slope and is refined with secant steps;
+    slowly moving targets usually need one or two shots. The first target, and any target the warm start
+    fails to reach within max_iters shots, is solved from scratch with iterative_aim(method="brent"); the
+    returned history then lists the failed tracking shots before the fallback's.
+    """
+
+    def __init__(self, speed, arc = "low", tol = 0.05, max_iters = 10, engine = "euler", g = 9.81, y0 = 0,
+                 drag = None):
+        if arc not in ("low", "high", "fastest"):
+            raise ValueError(f"Unknown arc {arc!r}; expected 'low', 'high' or 'fastest'")
+        self.speed = speed
+        self.arc = arc
+        self.tol = tol
+        self.max_iters = max_iters
+        self.engine = engine
+        self.g = g
+        self.y0 = y0
+        self.drag = drag
+        self.split = max_range_angle(speed, g, y0, drag) # max-range angle separating the low and high arcs
+        self.reset()
+
+    def reset(self):
+
+        """Forgets the previous solution, so the next aim() solves from scratch."""
+
+        self.angle = None
+        self.impact_x = None
+        self.slope = None
+        self._step_memo = {} # drag steps chosen for earlier shots, reused by nearby ones
+
+    def aim(self, target_x):
+
+        """Aims at target_x. Returns (angle, history, error) like iterative_aim."""
+
+        tracked = []
+        if self.angle is not None:
+            angle, tracked, error = self._track(target_x)
+            if error <= self.tol:
+                return angle, tracked, error
+        angle, history, error = iterative_aim(self.speed, target_x, 0.0, tol=self.tol, max_iters=self.max_iters,
+                                              plot=False, engine=self.engine, method="brent", arc=self.arc,
+                                              g=self.g, y0=self.y0, drag=self.drag)
+        if error <= self.tol:
+            # local slope from the two closest shots on this arc, analytic if they are too close to tell apart
+            best = sorted(history, key=lambda h: abs(h["miss"]))
+            slope = range_derivative(self.speed, angle, self.g, self.y0)
+            split = self.split
+            for other in best[1:]:
+                same_arc = (other["angle"] - split) * (angle - split) >= 0
+                if same_arc and abs(other["impact_x"] - best[0]["impact_x"]) > self.tol:
+                    slope = (other["impact_x"] - best[0]["impact_x"]) / (other["angle"] - best[0]["angle"])
+                    break
+            self.angle, self.impact_x, self.slope = angle, best[0]["impact_x"], slope
+        # the failed tracking shots were fired too; number the fallback's shots after them
+        history = tracked + [{**h, "try": len(tracked) + h["try"]} for h in history]
+        return angle, history, error
+
+    def _track(self, target_x):
+
+        """Secant refinement from the predicted angle; returns (angle, history, error) of its best shot."""
+
+        lo, hi = (self.split, 90.0) if self.arc == "high" else (0.0, self.split)
+        x_tol = 0.5 * self.tol
+        max_time = _flight_time_bound(self.speed, self.g, self.y0)
+        history = []
+        angle_a, x_a, slope = self.angle, self.impact_x, self.slope
+        angle = max(lo, min(hi, angle_a + _newton_step(target_x - x_a, slope)))
+        for i in range(self.max_iters):
+            stats = {}
+            impact_x, _, _, _ = _impact_for_budget(self._step_memo, self.speed, angle, x_tol, self.g, self.y0,
+                                                   max_time, self.engine, stats, self.drag)
+            miss = target_x - impact_x
+            history.append({"try": i + 1, "angle": angle, "impact_x": impact_x, "miss": miss, "x_tol": x_tol,
+                            "steps": stats["steps"]})
+            # only trust a secant over a range change larger than the impact noise
+            if abs(impact_x - x_a) > self.tol:
+                slope = (impact_x - x_a) / (angle - angle_a)
+            if abs(miss) <= self.tol:
+                self.angle, self.impact_x, self.slope = angle, impact_x, slope
+                return angle, history, abs(miss)
+            angle_a, x_a = angle, impact_x
+            angle = max(lo, min(hi, angle + _newton_step(miss, slope)))
+        best = min(history, key=lambda h: abs(h["miss"]))
+        return best["angle"], history, abs(best["miss"])
+
+
+class FiringTable:
+
+    """
+    Precomputed range → angle lookup for one cannon (fixed speed, g, y0, dt, engine and drag).
+    Holds range, flight time and apex height per launch angle from a dense sweep, split at the
+    max-range angle into a low and a high arc, and answers lookups by monotone (PCHIP) interpolation.
+    gaps lists (left, right) pairs of neighbouring sample angles across which the range jumps; targets
+    strictly between their two ranges cannot be hit and are treated as outside the table.
+    """
+
+    def __init__(self, angles, ranges, flight_times, apex_heights, speed, g = 9.81, y0 = 0, dt = 0.01,
+                 engine = "euler", drag = None, gaps = None):
+        self.angles = np.asarray(angles, dtype=float)
+        self.ranges = np.asarray(ranges, dtype=float)
+        self.flight_times = np.asarray(flight_times, dtype=float)
+        self.apex_heights = np.asarray(apex_heights, dtype=float)
+        self.speed, self.g, self.y0, self.dt, self.engine, self.drag = speed, g, y0, dt, engine, drag
+        self.gaps = np.empty((0, 2)) if gaps is None else np.asarray(gaps, dtype=float).reshape(-1, 2)
+
+        # per arc: sample indices with strictly increasing range, and PCHIP slopes of each column over range
+        i_max = int(np.argmax(self.ranges))
+        self._arcs = {}
+        for arc, order in (("low", slice(0, i_max + 1)), ("high", slice(None, i_max - 1 if i_max else None, -1))):
+            r = self.ranges[order]
+            increasing = r > np.maximum.accumulate(np.concatenate(([-np.inf], r[:-1])))
+            # plain slices keep memory-mapped tables shared; only drop samples when we have to
+            keep = order if increasing.all() else np.arange(len(self.ranges))[order][increasing]
+            r = self.ranges[keep]
+            columns = {name: (values[keep], _pchip_slopes(r, values[keep])) for name, values in
+                       (("angle", self.angles), ("flight_time", self.flight_times), ("apex_height", self.apex_heights))}
+            self._arcs[arc] = (r, columns)
+        self._arcs["fastest"] = self._arcs["low"] # the low arc always has the shorter flight
+
+        # range intervals skipped by each arc's jumps, as (lower, upper) arrays
+        left = np.searchsorted(self.angles, self.gaps[:, 0])
+        jump = np.sort(np.column_stack((self.ranges[left], self.ranges[left + 1])), axis=1)
+        on_low = left < i_max
+        self._gaps = {"low": jump[on_low].T, "high": jump[~on_low].T}
+        self._gaps["fastest"] = self._gaps["low"]
+
+    @classmethod
+    def build(cls, speed, g = 9.81, y0 = 0, dt = 0.01, engine = "euler", n_angles = 901, drag = None):
+
+        """Sweeps n_angles launch angles over [0°, 90°]; the Euler engine runs the sweep as one batch."""
+
+        angles = np.linspace(0.0, 90.0, n_angles)
+        max_time = _flight_time_bound(speed, g, y0)
+        if engine == "euler":
+            columns = simulate_projectiles(speed, angles, dt=dt, g=g, y0=y0, max_time=max_time, return_trajectory=False,
+                                           drag=drag)
+        else:
+            columns = np.array([simulate_impact(speed, a, dt=dt, g=g, y0=y0, max_time=max_time, engine=engine,
+                                                drag=drag) for a in angles]).T
+        impact_x, flight_time, apex_height, _ = columns
+        return cls(angles, impact_x, flight_time, apex_height, speed, g, y0, dt, engine, drag)
+
+    @classmethod
+    def build_adaptive(cls, speed, g = 9.81, y0 = 0, dt = 0.01, engine = "euler", max_error = 0.01, n_initial = 17,
+                       max_angles = 20001, drag = None):
+
+        """
+        Builds the smallest table whose lookups land within max_error metres of the target.
+        Starts from n_initial evenly spaced angles. Every interval is probed at the seven angles splitting it
+        into eighths (simulated once, when the interval appears); each round looks up every probe's
+        range in the current table and estimates its aiming error as |dR/dθ|·|θ_lookup - θ_probe|, with the
+        steepest slope between the interval's nodes and probes; a probe passes below 0.7·max_error, leaving
+        room for error between probes. Failing intervals are bisected (their midpoint probe becomes a node).
+        Because a new node also moves the PCHIP slopes of its neighbours, all intervals are rechecked each
+        round, so the search only stops once every probe passes in the final table, or when the table would
+        exceed max_angles. Failing intervals narrower than 1e-6° are not split further: they straddle a jump
+        in the discrete model (a shot that lands within its first step), so they become the table's gaps and
+        the targets they skip are reported as unreachable.
+        """
+
+        max_time = _flight_time_bound(speed, g, y0)
+        fractions = np.arange(1, 8) / 8 # probe points per interval; index 3 is the midpoint
+
+        def sweep(angles):
+            if engine == "euler":
+                return np.stack(simulate_projectiles(speed, angles, dt=dt, g=g, y0=y0, max_time=max_time,
+                                                     return_trajectory=False, drag=drag)[:3])
+            return np.array([simulate_impact(speed, a, dt=dt, g=g, y0=y0, max_time=max_time, engine=engine,
+                                             drag=drag)[:3] for a in angles]).reshape(-1, 3).T
+
+        def probe(left, right):
+            probe_angles = left[:, None] + fractions * (right - left)[:, None]
+            return probe_angles, sweep(probe_angles.ravel())[0].reshape(probe_angles.shape)
+
+        angles = np.linspace(0.0, 90.0, n_initial)
+        data = sweep(angles) # rows: range, flight time, apex height
+        probe_angles, probe_ranges = probe(angles[:-1], angles[1:])
+
+        while True:
+            table = cls(angles, *data, speed, g, y0, dt, engine, drag)
+
+            # aiming error of each probe when looked up on its own arc
+            split = angles[np.argmax(data[0])]
+            flat_angles, flat_ranges = probe_angles.ravel(), probe_ranges.ravel()
+            estimate = np.empty_like(flat_angles)
+            for arc, on_arc in (("low", flat_angles <= split), ("high", flat_angles > split)):
+                found, outside = table._lookup("angle", flat_ranges[on_arc], arc)
+                found[outside] = np.inf
+                estimate[on_arc] = found
+            points = np.column_stack((angles[:-1], probe_angles, angles[1:]))
+            point_ranges = np.column_stack((data[0, :-1], probe_ranges, data[0, 1:]))
+            slope = np.max(np.abs(np.diff(point_ranges, axis=1)) / np.diff(points, axis=1), axis=1)
+            with np.errstate(invalid="ignore"):
+                error = slope[:, None] * np.abs(estimate.reshape(probe_angles.shape) - probe_angles)
+            # the probes only sample each interval, and the discrete model's range has small kinks between
+            # them (where the step count changes), so they must pass with a 30% margin; discontinuities
+            # cannot be bisected away, so their intervals become gaps
+            bad = ~np.all(error <= 0.7 * max_error, axis=1)
+            jumps = bad & (np.diff(angles) <= 1e-6)
+            failed = bad & ~jumps
+
+            if not failed.any() or len(angles) + failed.sum() > max_angles:
+                break
+            # the failing midpoints become nodes; only the halves they create need new probes
+            n_new = failed.sum()
+            angles = np.concatenate((angles, probe_angles[failed, 3]))
+            data = np.concatenate((data, sweep(probe_angles[failed, 3])), axis=1)
+            is_new = np.concatenate((np.zeros(len(angles) - n_new, dtype=bool), np.ones(n_new, dtype=bool)))
+            order = np.argsort(angles)
+            angles, data, is_new = angles[order], data[:, order], is_new[order]
+            fresh = is_new[:-1] | is_new[1:]
+            kept_angles, kept_ranges = probe_angles[~failed], probe_ranges[~failed]
+            probe_angles = np.empty((len(angles) - 1, len(fractions)))
+            probe_ranges = np.empty_like(probe_angles)
+            probe_angles[~fresh], probe_ranges[~fresh] = kept_angles, kept_ranges
+            probe_angles[fresh], probe_ranges[fresh] = probe(angles[:-1][fresh], angles[1:][fresh])
+        return cls(angles, *data, speed, g, y0, dt, engine, drag, np.column_stack((angles[:-1], angles[1:]))[jumps])
+
+    @classmethod
+    def load_or_build(cls, speed, g = 9.81, y0 = 0, dt = 0.01, engine = "euler", n_angles = 901, cache_dir = None,
+                      drag = None, max_age_days = 30):
+
+        """
+        Loads the table for these parameters from cache_dir, building and saving it first if needed.
+        cache_dir defaults to a per-user cache directory ($XDG_CACHE_HOME or ~/.cache, under projectile_cannon).
+        Files are named by this module's source hash and a hash of the parameters, so a change to either
+        gives a new file and stale tables are never read. Every load refreshes the file's modification time,
+        and building a table deletes the firing_table_* files in cache_dir, of any version, that nobody has
+        loaded for max_age_days (None keeps them all); versions still in use, as during a rolling deploy,
+        keep their tables. Tables are memory-mapped read-only, so every process on a machine shares the same pages.
+        """
+
+        if cache_dir is None:
+            cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                     "projectile_cannon")
+        version = _code_version()
+        key = repr((float(speed), float(g), float(y0), float(dt), engine, int(n_angles), repr(drag)))
+        path = os.path.join(cache_dir, f"firing_table_{version}_{hashlib.sha256(key.encode()).hexdigest()[:20]}.npy")
+        try:
+            data = np.load(path, mmap_mode="r")
+            os.utime(path) # marks the table as in use for pruning
+        except (OSError, ValueError):
+            data = None
+        if data is None or data.shape != (4, n_angles):
+            table = cls.build(speed, g, y0, dt, engine, n_angles, drag)
+            _save_atomic(path, np.stack((table.angles, table.ranges, table.flight_times, table.apex_heights)))
+            if max_age_days is not None:
+                _prune_tables(cache_dir, max_age_days * 86400.0)
+            data = np.load(path, mmap_mode="r")
+        return cls(*data, speed, g, y0, dt, engine, drag)
+
+    def angle_for(self, target_x, arc = "low", tol = 0.05):
+
+        """
+        Launch angle(s) that hit target_x on the given arc ("low", "high" or "fastest").
+        Targets outside the table fall back to a silent Brent solve on the table's own model (same dt,
+        engine and drag); NaN if it cannot hit within tol.
+        """
+
+        angles, outside = self._lookup("angle", target_x, arc)
+        for i in np.flatnonzero(outside):
+            angles[i] = self._solve(float(np.ravel(target_x)[i]), arc, tol)
+        return float(angles[0]) if np.ndim(target_x) == 0 else angles
+
+    def _solve(self, target_x, arc, tol, max_iters = 50):
+
+        """Brent search for target_x with the table's simulation settings; the best angle, or NaN if it misses."""
+
+        max_time = _flight_time_bound(self.speed, self.g, self.y0)
+        shots = []
+
+        def shoot(angle):
+            impact_x, _, _, _ = simulate_impact(self.speed, angle, dt=self.dt, g=self.g, y0=self.y0,
+                                                max_time=max_time, engine=self.engine, drag=self.drag)
+            shots.append((abs(target_x - impact_x), angle))
+            return target_x - impact_x
+
+        _aim_bracketed(shoot, self.speed, arc, tol, max_iters, self.g, self.y0, self.drag, verbose=False)
+        error, angle = min(shots)
+        return angle if error <= tol else np.nan
+
+    def flight_time_for(self, target_x, arc = "low"):
+
+        """Flight time(s) of the shot that hits target_x on the given arc (NaN outside the table)."""
+
+        values, outside = self._lookup("flight_time", target_x, arc)
+        values[outside] = np.nan
+        return float(values[0]) if np.ndim(target_x) == 0 else values
+
+    def apex_for(self, target_x, arc = "low"):
+
+        """Apex height(s) of the shot that hits target_x on the given arc (NaN outside the table)."""
+
+        values, outside = self._lookup("apex_height", target_x, arc)
+        values[outside] = np.nan
+        return float(values[0]) if np.ndim(target_x) == 0 else values
+
+    def _lookup(self, column, target_x, arc):
+
+        """Interpolated column values at target_x on one arc, and the mask of targets outside the table."""
+
+        if arc not in self._arcs:
+            raise ValueError(f"Unknown arc {arc!r}; expected 'low', 'high' or 'fastest'")
+        ranges, columns = self._arcs[arc]
+        target_x = np.atleast_1d(np.asarray(target_x, dtype=float)).ravel()
+        values, slopes = columns[column]
+        outside = (target_x < ranges[0]) | (target_x > ranges[-1])
+        lower, upper = self._gaps[arc]
+        if len(lower):
+            outside |= ((target_x[:, None] > lower) & (target_x[:, None] < upper)).any(axis=1)
+        return _pchip_eval(ranges, values, slopes, target_x), outside
+
+
+def _code_version():
+
+    """Short hash of this module's source, part of every firing-table cache key."""
+
+    global _CODE_VERSION
+    if _CODE_VERSION is None:
+        with open(__file__, "rb") as f:
+            _CODE_VERSION = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _CODE_VERSION
+
+
+_CODE_VERSION = None
+
+
+def _prune_tables(cache_dir, max_age):
+
+    """Deletes the firing_table_*.npy files in cache_dir not written or loaded for max_age seconds."""
+
+    cutoff = time.time() - max_age
+    for name in os.listdir(cache_dir):
+        if name.startswith("firing_table_") and name.endswith(".npy"):
+            path = os.path.join(cache_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass # removed by another process, or still mapped on some platforms; the next build retries
+
+
+def _save_atomic(path, array):
+
+    """Writes array as .npy via a temporary file and a rename, so readers never see a partial file."""
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _pchip_slopes(x, y):
+
+    """Fritsch–Carlson slopes for a monotone piecewise-cubic Hermite interpolant through (x, y)."""
+
+    if len(x) < 2:
+        return np.zeros_like(y)
+    h = np.diff(x)
+    delta = np.diff(y) / h
+    slopes = np.empty_like(y)
+    slopes[0], slopes[-1] = delta[0], delta[-1]
+    # interior slopes: weighted harmonic mean of the neighbouring secants, zero at local extrema
+    w1 = 2 * h[1:] + h[:-1]
+    w2 = h[1:] + 2 * h[:-1]
+    same_sign = delta[:-1] * delta[1:] > 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes[1:-1] = np.where(same_sign, (w1 + w2) / (w1 / delta[:-1] + w2 / delta[1:]), 0.0)
+    return slopes
+
+
+def _pchip_eval(x, y, slopes, xq):
+
+    """Evaluates the cubic Hermite interpolant with the given node slopes at xq (clamped to the end intervals)."""
+
+    if len(x) < 2:
+        return np.full(np.shape(xq), y[0] if len(y) else np.nan)
+    k = np.clip(np.searchsorted(x, xq) - 1, 0, len(x) - 2)
+    h = x[k + 1] - x[k]
+    u = (xq - x[k]) / h
+    h00 = (1 + 2 * u) * (1 - u) ** 2
+    h10 = u * (1 - u) ** 2
+    h01 = u * u * (3 - 2 * u)
+    h11 = u * u * (u - 1)
+    return h00 * y[k] + h10 * h * slopes[k] + h01 * y[k + 1] + h11 * h * slopes[k + 1]
+
+
+
+class ResultCache:
+
+    """
+    Bounded LRU memo of simulate_projectile, angle_for_target_x and iterative_aim results.
+    Float arguments are quantized to a relative resolution before keying, so requests that differ only
+    below it share an entry. Entries are evicted oldest-use first once either max_entries or max_bytes
+    (array bytes plus a flat 8 bytes per other value) is exceeded.
+    Cached arrays are read-only and lists/dicts are copied on every return, so callers cannot corrupt entries.
+    """
+
+    def __init__(self, max_entries = 1024, max_bytes = 64 * 2**20, resolution = 1e-9):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.resolution = resolution
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+        self._entries = OrderedDict() # key -> (value, nbytes), least recently used first
+
+    def fetch(self, func, kwargs):
+
+        """Returns func(**kwargs) from the cache, computing and storing it on a miss."""
+
+        key = (func.__name__,) + tuple((name, _quantize(value, self.resolution)) for name, value in kwargs.items())
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return _cache_copy(entry[0])
+
+        self.misses += 1
+        # the computation itself runs uncached; the flag is per thread, so other threads keep their hits
+        outer, _CACHE_STATE.computing = getattr(_CACHE_STATE, "computing", False), True
+        try:
+            value = _freeze(func(**kwargs))
+        finally:
+            _CACHE_STATE.computing = outer
+        size = _cache_nbytes(value)
+        self._entries[key] = (value, size)
+        self.nbytes += size
+        while self._entries and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+        return _cache_copy(value)
+
+    def clear(self):
+
+        """Drops every entry; the counters are kept."""
+
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+
+        """Returns the hit/miss/eviction counters and the current size."""
+
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self._entries), "bytes": self.nbytes}
+
+
+_CACHE = None
+_CACHE_STATE = threading.local() # .computing: this thread is inside a cache miss
+
+
+def _cache_active():
+
+    """True if calls should go through the cache: it is enabled and this thread is not computing a miss."""
+
+    return _CACHE is not None and not getattr(_CACHE_STATE, "computing", False)
+
+
+def enable_cache(max_entries = 1024, max_bytes = 64 * 2**20, resolution = 1e-9):
+
+    """Turns on memoization with a fresh ResultCache and returns it (for its stats)."""
+
+    global _CACHE
+    _CACHE = ResultCache(max_entries, max_bytes, resolution)
+    return _CACHE
+
+
+def disable_cache():
+
+    """Turns memoization off and discards the cache."""
+
+    global _CACHE
+    _CACHE = None
+
+
+def _quantize(value, resolution):
+
+    """Hashable key for one argument: floats are rounded to a relative resolution, arrays element-wise."""
+
+    if isinstance(value, np.ndarray):
+        return tuple(_quantize(v, resolution) for v in value.ravel().tolist())
+    if isinstance(value, (bool, str)) or value is None:
+        return value
+    if not isinstance(value, (int, float, np.number)):
+        return repr(value) # models such as Drag are keyed by their parameters
+    value = float(value)
+    if value == 0 or not math.isfinite(value):
+        return value
+    mantissa, exponent = math.frexp(value)
+    return round(mantissa / resolution), exponent
+
+
+def _freeze(value):
+
+    """
+    Returns a result with every array read-only. Views (such as the rows of a trajectory buffer) are
+    replaced by trimmed copies first, so no writable base stays reachable and nbytes counts what is held.
+    """
+
+    if isinstance(value, np.ndarray):
+        if value.base is not None:
+            value = np.array(value)
+        value.flags.writeable = False
+        return value
+    if isinstance(value, tuple):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, list):
+        return [_freeze(item) for item in value]
+    if isinstance(value, dict):
+        return {name: _freeze(item) for name, item in value.items()}
+    return value
+
+
+def _cache_copy(value):
+
+    """Copies the mutable containers of a cached result; read-only arrays are shared."""
+
+    if isinstance(value, list):
+        return [_cache_copy(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_cache_copy(item) for item in value)
+    if isinstance(value, dict):
+        return {name: _cache_copy(item) for name, item in value.items()}
+    return value
+
+
+def _cache_nbytes(value):
+
+    """Approximate memory held by a cached result."""
+
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_cache_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_cache_nbytes(item) for item in value.values())
+    return 8
+
+
+if __name__ == "__main__":
+    # Base projectile test
+    t, xs, ys, vys = simulate_projectile()
+    plot_position(xs, ys)
+    plot_velocity(t, vys)
+    compute_metrics(t, xs, ys)
+
+    # Target-hitting demo
+    demo_target_hit()
+
+    # Controller test
+    best_angle, history, final_error = iterative_aim(
+        speed = 25.0,
+        target_x = 45.0,
+        initial_angle = 25.0,
+        learn_rate = 0.05,
+        max_iters = 15,
+        tol = 0.5
+        )
+    print(f"Final best angle ≈ {best_angle:.2f}° (error={final_error:.3f} m) after {len(history)} tries")
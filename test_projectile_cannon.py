@@ -0,0 +1,332 @@
+"""
+Regression checks for the engines that promise to reproduce the scalar Euler loop (the batched
+engine and the impact-only path match it exactly, the closed form to rounding), followed by
+behaviour checks for the aiming solvers, firing tables, result cache, atmosphere and 3D aiming.
+Run with: python -m pytest -q
+"""
+
+import threading
+
+import matplotlib
+matplotlib.use("Agg") # no windows while testing
+import numpy as np
+import pytest
+
+import Projectile_cannon as pc
+
+SPEEDS = [5.0, 25.0, 60.0]
+ANGLES = [0.5, 10.0, 37.0, 45.0, 72.0, 89.0]
+DTS = [0.01, 0.037, 0.2]
+HEIGHTS = [0.0, 3.5]
+
+
+@pytest.mark.parametrize("dt", DTS)
+@pytest.mark.parametrize("y0", HEIGHTS)
+def test_batch_trajectories_match_scalar_loop(dt, y0):
+    speeds, angles = np.meshgrid(SPEEDS, ANGLES)
+    times, xs, ys, vys, lengths = pc.simulate_projectiles(speeds, angles, dt=dt, y0=y0)
+    for i, (speed, angle) in enumerate(zip(speeds.ravel(), angles.ravel())):
+        expected = pc.simulate_projectile(speed, angle, dt=dt, y0=y0)
+        n = lengths[i]
+        assert n == len(expected[0])
+        for got, want in zip((times[i, :n], xs[i, :n], ys[i, :n], vys[i, :n]), expected):
+            np.testing.assert_array_equal(got, want)
+        assert np.isnan(times[i, n:]).all()
+
+
+@pytest.mark.parametrize("dt", DTS)
+@pytest.mark.parametrize("y0", HEIGHTS)
+def test_batch_impacts_match_scalar_impacts(dt, y0):
+    speeds, angles = np.meshgrid(SPEEDS, ANGLES)
+    columns = pc.simulate_projectiles(speeds, angles, dt=dt, y0=y0, return_trajectory=False)
+    for i, (speed, angle) in enumerate(zip(speeds.ravel(), angles.ravel())):
+        assert tuple(c[i] for c in columns) == pc.simulate_impact(speed, angle, dt=dt, y0=y0)
+
+
+@pytest.mark.parametrize("engine", ["euler", "verlet"])
+@pytest.mark.parametrize("impact", ["linear", "quadratic", "hermite"])
+@pytest.mark.parametrize("y0", HEIGHTS)
+def test_impact_only_matches_trajectory(engine, impact, y0):
+    for speed in SPEEDS:
+        for angle in ANGLES:
+            times, xs, ys, _ = pc.simulate_projectile(speed, angle, dt=0.037, y0=y0, engine=engine, impact=impact)
+            i_apex = int(np.argmax(ys))
+            expected = (xs[-1], times[-1], ys[i_apex], times[i_apex])
+            assert pc.simulate_impact(speed, angle, dt=0.037, y0=y0, engine=engine, impact=impact) == expected
+
+
+@pytest.mark.parametrize("dt", DTS)
+@pytest.mark.parametrize("y0", HEIGHTS)
+def test_closed_form_matches_scalar_loop(dt, y0):
+    for speed in SPEEDS:
+        for angle in ANGLES:
+            loop = pc.simulate_projectile(speed, angle, dt=dt, y0=y0)
+            closed = pc.simulate_projectile(speed, angle, dt=dt, y0=y0, engine="euler_closed_form")
+            assert len(closed[0]) == len(loop[0])
+            for got, want in zip(closed, loop):
+                np.testing.assert_allclose(got, want, rtol=1e-12, atol=1e-9)
+            np.testing.assert_allclose(pc.simulate_impact(speed, angle, dt=dt, y0=y0, engine="euler_closed_form"),
+                                       pc.simulate_impact(speed, angle, dt=dt, y0=y0), rtol=1e-12, atol=1e-9)
+
+
+@pytest.mark.parametrize("wind", [None, pc.LayeredWind([0, 50, 200], [2.0, 6.0, 11.0], 0.5)])
+def test_batch_with_drag_matches_scalar_loop(wind):
+    drag = pc.Drag(5, 0.1, atmosphere=pc.Atmosphere())
+    columns = pc.simulate_projectiles(60.0, ANGLES, max_time=20, return_trajectory=False, drag=drag, wind=wind)
+    for i, angle in enumerate(ANGLES):
+        expected = pc.simulate_impact(60.0, angle, max_time=20, drag=drag, wind=wind)
+        assert tuple(c[i] for c in columns) == expected
+
+
+def test_3d_engine_matches_2d_at_zero_azimuth():
+    drag = pc.Drag(5, 0.1)
+    flat = pc.simulate_projectiles(60.0, ANGLES, max_time=20, drag=drag)
+    spatial = pc.simulate_projectiles_3d(60.0, ANGLES, 0.0, max_time=20, drag=drag)
+    for got, want in zip((spatial[0], spatial[1], spatial[2], spatial[4]), (flat[0], flat[1], flat[2], flat[4])):
+        np.testing.assert_array_equal(got, want)
+    assert np.nanmax(np.abs(spatial[3])) == 0
+
+
+@pytest.mark.parametrize("engine", ["euler", "verlet"])
+def test_workspace_trajectories_match_and_reuse_the_buffer(engine):
+    workspace = pc.SimulationWorkspace()
+    buffer = workspace.log
+    for speed, angle in [(25.0, 45.0), (60.0, 10.0), (5.0, 80.0)]:
+        expected = pc.simulate_projectile(speed, angle, engine=engine)
+        got = pc.simulate_projectile(speed, angle, engine=engine, out=workspace)
+        for a, b in zip(got, expected):
+            np.testing.assert_array_equal(a, b)
+        assert got[0].base is buffer # views into the preallocated log, nothing new allocated
+    assert workspace.log is buffer
+
+
+@pytest.mark.parametrize("engine", ["euler", "verlet"])
+@pytest.mark.parametrize("x_tol", [0.1, 1.0])
+def test_drag_step_doubling_meets_budget(engine, x_tol):
+    drag = pc.Drag(1, 0.1)
+    for speed, angle in [(50.0, 45.0), (150.0, 10.0), (300.0, 70.0)]:
+        reference = pc.simulate_impact(speed, angle, engine="rk45", rtol=1e-11, atol=1e-11, max_time=100, drag=drag)
+        stats = {}
+        result = pc.simulate_impact(speed, angle, engine=engine, x_tol=x_tol, max_time=100, drag=drag, stats=stats)
+        assert abs(result[0] - reference[0]) <= x_tol
+        # the accepted probe is the answer, identical to a plain run at the chosen step
+        assert pc.simulate_impact(speed, angle, stats["dt"], engine=engine, max_time=100, drag=drag) == result
+
+
+@pytest.mark.parametrize("method", ["brent", "secant", "newton"])
+def test_multi_fidelity_aiming_converges_like_fixed(method):
+    targets = list(np.linspace(2.0, 63.0, 40)) + [10.339, 25.97, 27.02, 49.1597]
+    for target in targets:
+        angle, _, error = pc.iterative_aim(25.0, target, 30.0, plot=False, method=method, fidelity="multi")
+        assert error <= 0.05, target
+        # the answer is a full-accuracy shot: re-firing it at the full budget reproduces the miss
+        assert abs(pc.simulate_impact(25.0, angle, x_tol=0.025)[0] - target) == pytest.approx(error, abs=1e-12)
+
+
+def test_aimer_tracks_moving_targets_and_reports_fallback_shots():
+    aimer = pc.Aimer(25.0)
+    for target in np.linspace(30.0, 34.0, 9):
+        angle, history, error = aimer.aim(target)
+        assert error <= aimer.tol
+        assert abs(pc.simulate_impact(25.0, angle, x_tol=0.025)[0] - target) == pytest.approx(error, abs=1e-12)
+        if target > 30.0:
+            assert len(history) <= 2 # warm started from the previous solution
+    # a jump too large to track in max_iters shots falls back to a full solve; every shot fired is reported
+    aimer = pc.Aimer(25.0, max_iters=6)
+    aimer.aim(5.0)
+    angle, history, error = aimer.aim(62.0)
+    assert error <= aimer.tol
+    assert len(history) > aimer.max_iters
+    assert [h["try"] for h in history] == list(range(1, len(history) + 1))
+
+
+@pytest.fixture
+def cache():
+    yield pc.enable_cache(max_entries=3)
+    pc.disable_cache()
+
+
+def test_result_cache_hits_return_protected_copies(cache):
+    times, xs, _, _ = pc.simulate_projectile(25.0, 45.0)
+    again = pc.simulate_projectile(25.0, 45.0 + 1e-12) # within the key resolution
+    assert again[1] is xs and not xs.flags.writeable
+    angle, history, error = pc.iterative_aim(25.0, 40.0, 30.0, plot=False)
+    expected = [dict(h) for h in history]
+    history[0]["miss"] = None # callers get copies; the stored history is unchanged
+    assert pc.iterative_aim(25.0, 40.0, 30.0, plot=False) == (angle, expected, error)
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"]) == (2, 2)
+    for speed in (5.0, 6.0, 7.0):
+        pc.simulate_projectile(speed, 45.0)
+    assert cache.stats()["entries"] == 3 and cache.stats()["evictions"] == 2
+
+
+def test_result_cache_miss_prints_and_hit_is_silent(cache, capsys):
+    assert pc.angle_for_target_x(10.0, 500.0) == []
+    assert "Target too far" in capsys.readouterr().out
+    assert pc.angle_for_target_x(10.0, 500.0) == []
+    assert capsys.readouterr().out == ""
+
+
+def test_result_cache_serves_other_threads_during_a_miss(cache):
+    pc.simulate_projectile(25.0, 45.0)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 1.0
+
+    worker = threading.Thread(target=cache.fetch, args=(slow, {}))
+    worker.start()
+    started.wait(5)
+    pc.simulate_projectile(25.0, 45.0) # another thread is computing; this one still hits
+    release.set()
+    worker.join()
+    assert cache.stats()["hits"] == 1
+
+
+def test_firing_table_disk_cache_reuses_and_prunes_by_age(tmp_path):
+    other_version = tmp_path / "firing_table_0123456789abcdef_0.npy"
+    stale = tmp_path / "firing_table_0123456789abcdef_1.npy"
+    np.save(other_version, np.zeros((4, 3)))
+    np.save(stale, np.zeros((4, 3)))
+    old = pc.time.time() - 31 * 86400
+    pc.os.utime(stale, (old, old))
+
+    table = pc.FiringTable.load_or_build(25.0, n_angles=181, cache_dir=tmp_path)
+    saved = [p for p in tmp_path.glob("firing_table_*.npy") if p not in (other_version, stale)]
+    assert len(saved) == 1
+    # a table still used by another code version survives; one nobody loaded for 30 days is removed
+    assert other_version.exists() and not stale.exists()
+
+    built = pc.FiringTable.build(25.0, n_angles=181)
+    np.testing.assert_array_equal(table.ranges, built.ranges)
+    pc.os.utime(saved[0], (old, old))
+    loaded = pc.FiringTable.load_or_build(25.0, n_angles=181, cache_dir=tmp_path)
+    assert not loaded.ranges.flags.writeable # memory-mapped read-only, not rebuilt
+    assert pc.time.time() - saved[0].stat().st_mtime < 3600 # loading marks it as in use
+    assert loaded.angle_for(40.0) == pytest.approx(built.angle_for(40.0))
+
+
+def test_adaptive_table_meets_max_error_and_reports_jumps():
+    table = pc.FiringTable.build_adaptive(60.0, engine="verlet", dt=0.05, max_error=0.01)
+    max_time = pc._flight_time_bound(60.0, 9.81, 0)
+    for arc in ("low", "high"):
+        targets = np.linspace(0.01, table.ranges.max(), 500)
+        angles, outside = table._lookup("angle", targets, arc)
+        for target, angle in zip(targets[~outside], angles[~outside]):
+            impact_x = pc.simulate_impact(60.0, angle, dt=0.05, max_time=max_time, engine="verlet")[0]
+            assert abs(impact_x - target) <= 0.01, (arc, target)
+    # low shots land within their first step, so the low arc jumps from 0 m to about 3 m
+    assert len(table.gaps) == 1
+    assert np.isnan(table.angle_for(np.array([0.5, 1.5, 2.7]))).all()
+    assert np.isnan(table.flight_time_for(1.5))
+
+
+@pytest.mark.parametrize("method", ["newton", "secant"])
+@pytest.mark.parametrize("drag", [None, pc.Drag(5, 0.1)])
+def test_derivative_aiming_converges_in_a_few_shots(method, drag):
+    for target in (15.0, 40.0, 60.0):
+        angle, history, error = pc.iterative_aim(25.0, target, 30.0, plot=False, method=method, drag=drag)
+        assert error <= 0.05 and len(history) <= 6
+        assert abs(pc.simulate_impact(25.0, angle, x_tol=0.025, drag=drag)[0] - target) <= 0.05
+
+
+@pytest.mark.parametrize("y0", HEIGHTS)
+def test_range_derivative_matches_finite_difference(y0):
+    for angle in (5.0, 30.0, 60.0):
+        plus = pc.simulate_impact(25.0, angle + 1e-3, y0=y0, engine="euler_closed_form", dt=1e-4)[0]
+        minus = pc.simulate_impact(25.0, angle - 1e-3, y0=y0, engine="euler_closed_form", dt=1e-4)[0]
+        assert pc.range_derivative(25.0, angle, y0=y0) == pytest.approx((plus - minus) / 2e-3, rel=1e-3)
+
+
+@pytest.mark.parametrize("drag", [None, pc.Drag(5, 0.1)])
+def test_brent_aiming_picks_the_requested_arc(drag):
+    split = pc.max_range_angle(25.0, drag=drag)
+    angles = {}
+    for arc in ("low", "high", "fastest"):
+        angles[arc], _, error = pc.iterative_aim(25.0, 40.0, 0.0, plot=False, method="brent", arc=arc, drag=drag)
+        assert error <= 0.05
+    assert angles["low"] < split < angles["high"]
+    assert angles["fastest"] == angles["low"]
+
+
+def test_brent_aiming_stops_after_one_shot_when_out_of_reach():
+    angle, history, error = pc.iterative_aim(25.0, 80.0, 0.0, plot=False, method="brent")
+    assert len(history) == 1 and error > 0.05
+    assert angle == pytest.approx(pc.max_range_angle(25.0)) # the farthest shot is the closest miss
+
+
+@pytest.mark.parametrize("arc", ["low", "high"])
+@pytest.mark.parametrize("drag", [None, pc.Drag(5, 0.1)])
+def test_aim_batch_hits_every_reachable_target(arc, drag):
+    speeds = np.repeat([15.0, 25.0, 40.0], 40)
+    targets = np.tile(np.linspace(1.0, 150.0, 40), 3)
+    angles, errors, iterations = pc.aim_batch(speeds, targets, arc=arc, drag=drag)
+    reachable = ~np.isnan(angles)
+    reach = pc.simulate_projectiles(speeds, np.where(reachable, angles, 45.0), max_time=20, return_trajectory=False,
+                                    drag=drag)[0]
+    np.testing.assert_array_less(np.abs(reach - targets)[reachable], 0.05)
+    np.testing.assert_array_equal(errors[reachable], np.abs(reach - targets)[reachable])
+    split = pc._max_range_angles(speeds, 9.81, 0, drag, 0.01) if drag else np.full(speeds.shape, 45.0)
+    side = split - angles if arc == "low" else angles - split # a hit at the split angle itself is on both arcs
+    assert (side[reachable] >= -1e-9).all()
+    # targets past each speed's maximum range are reported unreachable after the two edge shots
+    beyond = targets > pc.simulate_projectiles(speeds, split, max_time=20, return_trajectory=False, drag=drag)[0]
+    assert beyond.any() and np.isnan(angles[beyond]).all() and (iterations[beyond] == 2).all()
+    assert reachable.sum() + beyond.sum() == len(targets)
+
+
+def test_firing_table_lookups_hit_and_fall_back_to_a_solve():
+    table = pc.FiringTable.build(25.0)
+    targets = np.linspace(1.0, 63.0, 50)
+    for arc in ("low", "high"):
+        angles = table.angle_for(targets, arc=arc)
+        for target, angle in zip(targets, angles):
+            impact_x, flight_time, apex_height, _ = pc.simulate_impact(25.0, angle)
+            assert abs(impact_x - target) <= 0.05
+            assert (angle <= 45.1) == (arc == "low")
+        np.testing.assert_allclose(table.apex_for(targets, arc=arc),
+                                   [pc.simulate_impact(25.0, a)[2] for a in angles], atol=0.05)
+    assert np.isnan(table.angle_for(70.0)) and np.isnan(table.flight_time_for(70.0))
+
+    # a 10° grid tops out short of the maximum range; lookups beyond it are solved on the table's model
+    coarse = pc.FiringTable.build(25.0, n_angles=10)
+    assert coarse.ranges.max() < 63.0
+    angle = coarse.angle_for(63.0)
+    assert abs(pc.simulate_impact(25.0, angle)[0] - 63.0) <= 0.05
+    assert np.isnan(coarse.flight_time_for(63.0))
+
+
+def test_atmosphere_matches_standard_values():
+    air = pc.Atmosphere()
+    # ISA reference points (geopotential heights): density kg/m³, speed of sound m/s
+    for height, density, sound_speed in ((0.0, 1.2250, 340.294), (11000.0, 0.36392, 295.070),
+                                         (20000.0, 0.088035, 295.070), (32000.0, 0.013225, 303.131)):
+        assert air.density(height) == pytest.approx(density, rel=1e-4)
+        assert air.sound_speed(height) == pytest.approx(sound_speed, rel=1e-5)
+    assert air.air(40000.0) == air.air(32000.0) and air.air(-50.0) == air.air(0.0) # held at the ends
+    heights = np.linspace(-100.0, 33000.0, 997)
+    np.testing.assert_allclose(air.air(heights)[0], pc._isa(np.clip(heights, 0, 32000))[1], rtol=1e-5)
+    np.testing.assert_array_equal(air.air(heights)[1], [air.air(float(h))[1] for h in heights])
+    assert pc.Atmosphere(ground_altitude=1500.0).air(500.0) == pytest.approx(air.air(2000.0), rel=1e-12)
+
+
+@pytest.mark.parametrize("arc", ["low", "high"])
+def test_aim_3d_hits_ground_targets_in_a_crosswind(arc):
+    drag, wind = pc.Drag(5, 0.1), pc.ConstantWind(0.0, 0.0, 6.0)
+    bearings = np.radians(np.linspace(-150.0, 150.0, 12))
+    target_xs, target_zs = 30.0 * np.cos(bearings), 30.0 * np.sin(bearings)
+    target_xs, target_zs = np.append(target_xs, 500.0), np.append(target_zs, 0.0) # the last is out of reach
+    azimuths, elevations, errors, iterations = pc.aim_3d(25.0, target_xs, target_zs, arc=arc, drag=drag, wind=wind)
+    assert np.isnan(azimuths[-1]) and np.isnan(elevations[-1])
+    impact_x, impact_z, _, _, _ = pc.simulate_projectiles_3d(25.0, elevations[:-1], azimuths[:-1], max_time=20,
+                                                            return_trajectory=False, drag=drag, wind=wind)
+    miss = np.hypot(impact_x - target_xs[:-1], impact_z - target_zs[:-1])
+    np.testing.assert_array_less(miss, 0.05)
+    np.testing.assert_allclose(errors[:-1], miss)
+    assert ((elevations[:-1] < 45.0) == (arc == "low")).all()
+    # a wind towards +z drifts shots that way, so aims across the wind are turned towards -z of the bearing
+    across = np.abs(np.cos(bearings)) > 0.5
+    assert (np.sin(np.radians(azimuths[:-1])) < np.sin(bearings))[across].all()